@@ -0,0 +1,171 @@
+"""Headless benchmark of every page's data path.
+
+Builds synthetic datasets with ``generate_dataset()`` and times each stage
+that a page runs on a rerun.  Wall time is the median of several untraced
+runs; peak memory comes from one extra run under tracemalloc.  Results can be
+stored as a baseline and later runs compared against it, where a slowdown
+only counts once it exceeds the tolerance and the runs' measured noise.
+
+    python benchmarks/bench_pages.py --sizes 250 10000 --save-baseline
+    python benchmarks/bench_pages.py --sizes 250 10000 --compare
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from inbloom import data, export, leaderboard, summary  # noqa: E402
+
+DEFAULT_SIZES = [250, 10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baselines", "pages.json")
+
+
+def _dashboard(df):
+    # A typical sidebar selection: a few events and states, every college and day
+    filtered = data.filter_dataset(df, events=data.EVENTS[:5], states=data.STATES[:6])
+    return data.dashboard_aggregates(filtered)
+
+
+def _wordcloud(df):
+    text = data.feedback_text(df, data.EVENTS[0])
+    return data.build_wordcloud(text) if text.strip() else None
+
+
+def _leaderboards(df):
+    # Build once, then serve every per-event leaderboard
+    board = leaderboard.Leaderboard(df)
+    return [board.top("Event", event) for event in board.groups("Event")]
+
+
+def _schedule(df):
+    return data.event_schedule(df), data.schedule_table(df)
+
+
+def _export(fmt):
+    # The whole table through the background exporter's writer, as Prepare Download runs it
+    def stage(df):
+        with tempfile.TemporaryDirectory() as directory:
+            export.write_slice(df, None, os.path.join(directory, export.file_name(fmt, "none")), fmt)
+    return stage
+
+
+STAGES = {
+    "featured_events": lambda df: data.featured_event_stats(df, data.EVENTS[:4]),
+    "top_10": lambda df: data.top_performers(df, 10),
+    "leaderboards": _leaderboards,
+    "dashboard": _dashboard,
+    "summary": summary.summarize,
+    "wordcloud": _wordcloud,
+    "sentiment": data.sentiment_counts,
+    "schedule": _schedule,
+    "export_csv": _export("CSV"),
+    "export_excel": _export("Excel"),
+}
+
+
+def measure(func, *args, repeat=5):
+    # Timed runs go untraced: tracemalloc slows allocation-heavy stages many times
+    # over.  One more run under tracemalloc records the peak.
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    median = statistics.median(times)
+    # Median absolute deviation: how far a run typically strays from the median
+    noise = statistics.median(abs(t - median) for t in times)
+    return {"seconds": median, "noise": noise, "peak_mb": peak / 2**20}
+
+
+def run(sizes, stages, repeat, seed):
+    results = {}
+    for n_rows in sizes:
+        generation = measure(data.generate_dataset, n_rows, seed, repeat=min(repeat, 3))
+        df = data.generate_dataset(n_rows, seed=seed)
+        size_results = {"generate_dataset": generation}
+        for name in stages:
+            size_results[name] = measure(STAGES[name], df, repeat=repeat)
+        results[str(n_rows)] = size_results
+    return results
+
+
+def compare(results, baseline, tolerance, noise_factor, min_delta):
+    # A stage regresses only when the slowdown beats the relative tolerance, the
+    # run-to-run noise of both measurements and an absolute floor
+    regressions = []
+    for n_rows, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get(n_rows, {}).get(name)
+            if previous is None:
+                continue
+            noise = max(current.get("noise", 0.0), previous.get("noise", 0.0))
+            allowed = max(previous["seconds"] * tolerance, noise_factor * noise, min_delta)
+            if current["seconds"] - previous["seconds"] > allowed:
+                regressions.append(f"{name} @ {n_rows} rows: time {previous['seconds']:.4f}s -> {current['seconds']:.4f}s")
+            if current["peak_mb"] > previous["peak_mb"] * (1 + tolerance):
+                regressions.append(f"{name} @ {n_rows} rows: peak {previous['peak_mb']:.1f}MB -> {current['peak_mb']:.1f}MB")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'rows':>10}  {'stage':<18} {'time (ms)':>12} {'noise (ms)':>11} {'peak (MB)':>10}")
+    for n_rows, stages in results.items():
+        for name, stats in stages.items():
+            print(f"{n_rows:>10}  {name:<18} {stats['seconds'] * 1000:12.2f} {stats['noise'] * 1000:11.2f} {stats['peak_mb']:10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per stage; the median time is kept")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if any stage regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before a stage counts as regressed")
+    parser.add_argument("--noise-factor", type=float, default=5.0,
+                        help="A slowdown within this many median absolute deviations is treated as noise")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Slowdowns under this many seconds are ignored")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.stages, args.repeat, args.seed)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.tolerance, args.noise_factor, args.min_delta)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
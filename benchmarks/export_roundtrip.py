@@ -0,0 +1,95 @@
+"""Round-trip check of every export format and compression.
+
+Writes a filtered slice of a synthetic dataset with ``inbloom.export`` in
+several chunks, reads each file back and compares it with the slice.  The
+slice is checked as ``generate_dataset()`` returns it and with the
+categorical and Arrow-backed string columns that shared-dataset mode loads.
+
+    python benchmarks/export_roundtrip.py --rows 5000 --chunk-rows 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from inbloom import data, export  # noqa: E402
+
+
+def shared_layout(df):
+    # The dtypes inbloom.shared hands back: categories, plus Arrow strings for near-unique columns
+    categorical = {column: "category" for column in ("Gender", "College", "State", "Event", "Day", "Time")}
+    arrow_strings = {column: pd.ArrowDtype(pa.string()) for column in ("ParticipantID", "Name")}
+    return df.astype({**categorical, **arrow_strings})
+
+
+def read_back(path, fmt, compression):
+    if fmt == "CSV":
+        return pd.read_csv(path, compression=None if compression == "none" else compression)
+    if fmt == "Parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pandas()
+    if fmt == "Feather":
+        return pa.ipc.open_file(path).read_all().to_pandas()
+    return pd.read_excel(path, sheet_name="InBloom_Data")
+
+
+def as_text(df):
+    # Formats differ in the dtypes they restore; the values must not
+    return df.reset_index(drop=True).astype(object).astype(str)
+
+
+def check(df, rows, fmt, compression, chunk_rows, directory):
+    path = os.path.join(directory, export.file_name(fmt, compression))
+    started = time.perf_counter()
+    export.write_slice(df, rows, path, fmt, compression, chunk_rows)
+    elapsed = time.perf_counter() - started
+    back = read_back(path, fmt, compression)
+    expected = df.iloc[rows]
+    ok = list(back.columns) == list(expected.columns) and as_text(back).equals(as_text(expected))
+    size = os.path.getsize(path)
+    os.remove(path)
+    return ok, elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    df = data.generate_dataset(args.rows, seed=args.seed)
+    rows = np.flatnonzero(df["Event"].isin(data.EVENTS[:5]).to_numpy())
+    layouts = {"plain": df, "shared": shared_layout(df)}
+
+    failures = 0
+    print(f"{'layout':<8} {'format':<8} {'compression':<12} {'result':<8} {'time (ms)':>10} {'size (KB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for layout, frame in layouts.items():
+            for fmt in export.FORMATS:
+                for compression in export.SUPPORTED_COMPRESSIONS[fmt]:
+                    try:
+                        ok, elapsed, size = check(frame, rows, fmt, compression, args.chunk_rows, directory)
+                    except ImportError as exc:
+                        print(f"{layout:<8} {fmt:<8} {compression:<12} skipped  ({exc})")
+                        continue
+                    except Exception as exc:
+                        failures += 1
+                        print(f"{layout:<8} {fmt:<8} {compression:<12} error    {exc!r}")
+                        continue
+                    failures += not ok
+                    print(f"{layout:<8} {fmt:<8} {compression:<12} {'ok' if ok else 'MISMATCH':<8} "
+                          f"{elapsed * 1000:10.1f} {size / 1024:10.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Cold-start import profile for inblooms.py.
+
+Runs the app once per fresh interpreter under ``python -X importtime``,
+rendering the default Home page through Streamlit's ``AppTest`` (bare mode
+does not keep ``st.session_state``), and parses the import-time report.  Exits non-zero when the median total import time goes
+over the budget or when a page-specific dependency is loaded on cold start.
+
+    python benchmarks/import_time.py --budget-ms 3000 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "inblooms.py")
+
+# Packages that only some pages need; none of them may load on cold start
+LAZY_PACKAGES = ["matplotlib", "wordcloud"]
+
+RUN_APP = (
+    "import os, sys; "
+    "os.chdir({root!r}); sys.path.insert(0, {root!r}); "
+    "from streamlit.testing.v1 import AppTest; "
+    "at = AppTest.from_file({app!r}, default_timeout=120); at.run(); "
+    "sys.exit('\\n'.join('App exception: ' + e.value for e in at.exception) or None)"
+)
+
+
+def parse_importtime(stderr):
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    modules = {}
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us = int(parts[0].strip())
+        cumulative_us = int(parts[1].strip())
+        raw_name = parts[2].rstrip()
+        name = raw_name.strip()
+        modules[name] = self_us
+        # Top-level imports are the ones without nesting indentation
+        if len(raw_name) - len(raw_name.lstrip()) <= 1:
+            root = name.split(".")[0]
+            top_level[root] = top_level.get(root, 0) + cumulative_us
+    return modules, top_level
+
+
+def profile_once():
+    code = RUN_APP.format(root=REPO_ROOT, app=APP_PATH)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=REPO_ROOT,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"inblooms.py failed to run (exit code {proc.returncode})")
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("INBLOOM_IMPORT_BUDGET_MS", 3000)),
+                        help="Maximum median total import time in milliseconds")
+    parser.add_argument("--runs", type=int, default=3, help="Number of fresh interpreters to profile")
+    parser.add_argument("--top", type=int, default=10, help="How many of the heaviest packages to list")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    totals = []
+    per_package = {}
+    loaded = set()
+    for _ in range(args.runs):
+        modules, top_level = profile_once()
+        loaded.update(modules)
+        totals.append(sum(top_level.values()) / 1000)
+        for package, cumulative_us in top_level.items():
+            per_package.setdefault(package, []).append(cumulative_us / 1000)
+
+    median_total = statistics.median(totals)
+    heaviest = sorted(
+        ((package, statistics.median(times)) for package, times in per_package.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+    lazy_loaded = sorted(
+        package for package in LAZY_PACKAGES
+        if any(module == package or module.startswith(package + ".") for module in loaded)
+    )
+
+    print(f"Cold-start import time: {median_total:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for package, ms in heaviest:
+        print(f"  {package:<30} {ms:8.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump({
+                "median_total_ms": median_total,
+                "runs_ms": totals,
+                "budget_ms": args.budget_ms,
+                "heaviest": dict(heaviest),
+                "lazy_packages_loaded": lazy_loaded,
+            }, fh, indent=2)
+
+    failed = False
+    if lazy_loaded:
+        print(f"FAIL: page-specific packages imported on cold start: {', '.join(lazy_loaded)}")
+        failed = True
+    if median_total > args.budget_ms:
+        print(f"FAIL: cold-start import time {median_total:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
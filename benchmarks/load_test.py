@@ -0,0 +1,349 @@
+"""Concurrent-session load test for inblooms.py.
+
+Starts one headless ``streamlit run`` server and drives N simulated viewers
+against it over the same websocket protocol the browser uses, so every
+session lives in the one server process and shares its ``st.cache_resource``
+objects, derived store and session memory manager.  Each session switches
+pages and Dashboard filters following a weighted mix, and the harness
+reports throughput, tail latency and the resident memory of the server:
+idle, warm (after one session has visited every page and disconnected),
+peak, and with all N sessions still connected.
+
+    python benchmarks/load_test.py --sessions 50 --actions 20 --concurrency 8 --output report.json
+
+The server inherits this process's environment.  Run it once per
+configuration and compare the ``rss_mb`` figures of the JSON reports, e.g.
+with and without ``INBLOOM_SHARED_DATASET``:
+
+    python benchmarks/load_test.py --output per-session.json
+    INBLOOM_SHARED_DATASET=/tmp/inbloom-shared python benchmarks/load_test.py --output shared.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "inblooms.py")
+
+# Share of interactions per page, roughly what we see during the festival.
+# Image Processing is left out because it needs a file upload to do any work.
+PAGE_MIX = {
+    "Home": 0.30,
+    "Dashboard": 0.30,
+    "Dataset": 0.15,
+    "Event Schedule": 0.15,
+    "Text Analysis": 0.10,
+}
+# Chance that a Dashboard visit also changes a sidebar filter
+FILTER_CHANGE_RATE = 0.6
+
+
+def rss_mb(pid):
+    # Resident memory of another process; None where /proc is not available
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, timeout):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH,
+         "--server.headless", "true",
+         "--server.port", str(port),
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {timeout:g}s")
+
+
+class Session:
+    """One viewer: a websocket plus the widget values its browser would send."""
+
+    def __init__(self, session_id, url, timeout, rng):
+        self.session_id = session_id
+        self.url = url
+        self.timeout = timeout
+        self.rng = rng
+        self.ws = None
+        self.states = {}
+        self.widgets = {}
+        # The server replaces large messages it already sent with a reference to their hash
+        self.message_cache = {}
+        self.latencies = []
+        self.errors = 0
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.url, max_message_size=512 * 2**20)
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def rerun(self):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+        try:
+            widgets = await asyncio.wait_for(self._read_run(), self.timeout)
+        except asyncio.TimeoutError:
+            self.errors += 1
+            widgets = self.widgets
+        self.latencies.append(time.perf_counter() - started)
+        # Like the browser, only send values for widgets the last run drew
+        self.widgets = widgets
+        self.states = {key: state for key, state in self.states.items() if key in widgets}
+
+    async def _read_run(self):
+        widgets = {}
+        while True:
+            payload = await self.ws.read_message()
+            if payload is None:
+                raise ConnectionError(f"session {self.session_id}: server closed the websocket")
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            if msg.WhichOneof("type") == "ref_hash":
+                msg = self.message_cache.get(msg.ref_hash, msg)
+            elif msg.metadata.cacheable:
+                self.message_cache[msg.hash] = msg
+
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                field = element.WhichOneof("type")
+                if field == "exception":
+                    self.errors += 1
+                elif field is not None:
+                    proto = getattr(element, field)
+                    widget_id = getattr(proto, "id", "")
+                    if widget_id:
+                        widgets[widget_id] = (field, proto)
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.errors += 1
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return widgets
+
+    def _find(self, field, match):
+        for widget_id, (kind, proto) in self.widgets.items():
+            if kind == field and match(proto):
+                return widget_id, proto
+        raise LookupError(f"session {self.session_id}: no {field} widget on this page")
+
+    def set_page(self, page):
+        widget_id, proto = self._find("radio", lambda radio: "Home" in radio.options)
+        self.states[widget_id] = WidgetState(id=widget_id, int_value=list(proto.options).index(page))
+
+    def set_multiselect(self, label, values):
+        widget_id, proto = self._find("multiselect", lambda select: select.label == label)
+        options = list(proto.options)
+        state = WidgetState(id=widget_id)
+        state.int_array_value.data.extend(options.index(value) for value in values)
+        self.states[widget_id] = state
+
+    def change_filters(self):
+        _, event_filter = self._find("multiselect", lambda select: select.label == "Select Event")
+        _, state_filter = self._find("multiselect", lambda select: select.label == "Select State")
+        events = [option for option in event_filter.options if option != "All"]
+        states = [option for option in state_filter.options if option != "All"]
+        if self.rng.random() < 0.3:
+            self.set_multiselect("Select Event", ["All"])
+            self.set_multiselect("Select State", ["All"])
+        else:
+            self.set_multiselect("Select Event", self.rng.sample(events, self.rng.randint(1, min(4, len(events)))))
+            self.set_multiselect("Select State", self.rng.sample(states, self.rng.randint(1, min(6, len(states)))))
+
+    async def visit(self, page, change_filters, slot):
+        self.set_page(page)
+        async with slot:
+            await self.rerun()
+        if page == "Dashboard" and change_filters:
+            self.change_filters()
+            async with slot:
+                await self.rerun()
+
+
+async def warm_up(url, timeout):
+    # Visit every page once so imports, cache_resource objects and shared data are loaded
+    session = Session(-1, url, timeout, random.Random(0))
+    slot = asyncio.Semaphore(1)
+    await session.connect()
+    try:
+        await session.rerun()
+        for page in PAGE_MIX:
+            await session.visit(page, True, slot)
+    finally:
+        session.close()
+    return session.errors
+
+
+async def drive(session, actions, think_time, slot):
+    pages, weights = zip(*PAGE_MIX.items())
+    async with slot:
+        await session.rerun()
+    for _ in range(actions):
+        if think_time:
+            await asyncio.sleep(session.rng.uniform(0, 2 * think_time))
+        page = session.rng.choices(pages, weights=weights)[0]
+        await session.visit(page, session.rng.random() < FILTER_CHANGE_RATE, slot)
+
+
+async def run_sessions(pid, url, n_sessions, actions, concurrency, think_time, timeout, seed):
+    warm_errors = await warm_up(url, timeout)
+    # Let the server finish tearing down the warm-up session before sampling
+    await asyncio.sleep(1.0)
+    rss = {"warm": rss_mb(pid)}
+
+    samples = []
+
+    async def sample_rss():
+        while True:
+            samples.append(rss_mb(pid))
+            await asyncio.sleep(0.2)
+
+    sessions = [Session(i, url, timeout, random.Random(seed + i)) for i in range(n_sessions)]
+    slot = asyncio.Semaphore(concurrency or n_sessions)
+    sampler = asyncio.ensure_future(sample_rss())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(session.connect() for session in sessions))
+        await asyncio.gather(*(drive(session, actions, think_time, slot) for session in sessions))
+        elapsed = time.perf_counter() - started
+        # Every session is still connected here, so its state is part of the RSS
+        await asyncio.sleep(0.5)
+        rss["after"] = rss_mb(pid)
+    finally:
+        sampler.cancel()
+        for session in sessions:
+            session.close()
+    rss["peak"] = max((sample for sample in samples + [rss["after"]] if sample is not None), default=None)
+    return sessions, elapsed, warm_errors, rss
+
+
+def run(n_sessions, actions, concurrency, think_time, timeout, seed, port):
+    port = port or free_port()
+    server = start_server(port, timeout)
+    try:
+        idle = rss_mb(server.pid)
+        sessions, elapsed, warm_errors, rss = asyncio.run(run_sessions(
+            server.pid, f"ws://localhost:{port}/_stcore/stream",
+            n_sessions, actions, concurrency, think_time, timeout, seed,
+        ))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    latencies_ms = np.array([latency for s in sessions for latency in s.latencies]) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+
+    def mb(value):
+        return None if value is None else round(value, 1)
+
+    per_session = None
+    if rss["warm"] is not None and rss["after"] is not None:
+        per_session = round((rss["after"] - rss["warm"]) / n_sessions, 2)
+    return {
+        "sessions": n_sessions,
+        "concurrency": concurrency or n_sessions,
+        "shared_dataset": bool(os.environ.get("INBLOOM_SHARED_DATASET")),
+        "interactions": int(latencies_ms.size),
+        "errors": sum(s.errors for s in sessions) + warm_errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(latencies_ms.size / elapsed, 2),
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(latencies_ms.max()), 2),
+        },
+        # Of the one server process hosting every session
+        "rss_mb": {
+            "idle": mb(idle),
+            "warm": mb(rss["warm"]),
+            "after": mb(rss["after"]),
+            "peak": mb(rss["peak"]),
+            "per_session": per_session,
+        },
+        "per_session_latency_ms": {
+            str(s.session_id): round(statistics.median(s.latencies) * 1000, 2) for s in sessions
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Number of simulated viewers")
+    parser.add_argument("--actions", type=int, default=10, help="Page or filter changes per session")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Reruns in flight at once across all sessions (0 = one per session)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between actions in seconds")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Per-rerun and server start-up timeout in seconds")
+    parser.add_argument("--port", type=int, default=0, help="Server port (0 = any free port)")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run(args.sessions, args.actions, args.concurrency, args.think_time, args.timeout, args.seed, args.port)
+
+    print(f"Sessions: {report['sessions']} (concurrency {report['concurrency']}, "
+          f"shared dataset {'on' if report['shared_dataset'] else 'off'}), "
+          f"interactions: {report['interactions']}, errors: {report['errors']}")
+    print(f"Throughput: {report['throughput_rps']} reruns/s over {report['elapsed_s']} s")
+    latency = report["latency_ms"]
+    print(f"Latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    rss = report["rss_mb"]
+    print(f"Server RSS MB: idle {rss['idle']}  warm {rss['warm']}  after {rss['after']}  "
+          f"peak {rss['peak']}  per session {rss['per_session']}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
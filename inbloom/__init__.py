@@ -0,0 +1,2 @@
+# Helper modules for the InBloom '25 Streamlit app (inblooms.py).
+# Kept import-free so that loading the package adds nothing to cold start.
@@ -0,0 +1,122 @@
+"""Plotly figures that are built outside a page, ahead of time or from sketches."""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Color palette for different events
+EVENT_COLORS = {
+    "Solo Dance": "#FF6B6B",
+    "Group Dance": "#4ECDC4",
+    "Singing": "#45B7D1",
+    "Drama": "#96CEB4",
+    "Debate": "#FFEEAD",
+    "Photography": "#D4A5A5",
+    "Poetry": "#9B9B9B",
+    "Fashion Show": "#FFD93D",
+    "Quiz": "#6C5B7B",
+    "Treasure Hunt": "#FF8C42"
+}
+
+
+def state_choropleth(state_counts, geojson, featureidkey, title="Participant Distribution"):
+    fig = px.choropleth(
+        state_counts,
+        geojson=geojson,
+        locations="State",
+        featureidkey=featureidkey,
+        color="Count",
+        hover_name="State",
+        color_continuous_scale="Viridis",
+        title=title
+    )
+    # Only the shipped states are drawn, so hide the world basemap and zoom to them
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(margin=dict(l=0, r=0, t=40, b=0))
+    return fig
+
+
+def schedule_timeline(day_schedule):
+    fig = go.Figure()
+
+    for event in day_schedule['Event'].unique():
+        event_data = day_schedule[day_schedule['Event'] == event]
+        fig.add_trace(go.Scatter(
+            x=event_data['Time'],
+            y=[event] * len(event_data),
+            mode='markers+text',
+            name=event,
+            text=event_data['Participants'].apply(lambda x: f'{x} participants'),
+            marker=dict(
+                size=20,
+                color=EVENT_COLORS[event],
+                symbol='circle'
+            ),
+            textposition="top center"
+        ))
+
+    fig.update_layout(
+        plot_bgcolor='#1a1a1a',
+        paper_bgcolor='#1a1a1a',
+        font=dict(color='white'),
+        showlegend=True,
+        height=400,
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='#2d2d2d',
+            title='Time',
+            title_font=dict(color='white')
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#2d2d2d',
+            title='Event',
+            title_font=dict(color='white')
+        ),
+        legend=dict(
+            bgcolor='#2d2d2d',
+            bordercolor='#3d3d3d'
+        )
+    )
+    return fig
+
+
+def sketch_bin_edges(kll, bins=20):
+    # Edges spanning everything the sketch has seen; half-integer bounds keep
+    # integer values such as scores in the middle of a bin
+    if not kll.n:
+        return np.linspace(-0.5, 0.5, bins + 1)
+    return np.linspace(np.floor(kll.min) - 0.5, np.ceil(kll.max) + 0.5, bins + 1)
+
+
+def histogram_from_sketch(kll, bin_edges, title, color):
+    # Bin counts from the sketch's CDF instead of scanning the rows
+    counts = np.diff(kll.cdf(bin_edges)) * kll.n
+    fig = go.Figure(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=np.round(counts),
+        width=np.diff(bin_edges),
+        marker_color=color
+    ))
+    fig.update_layout(title=title, bargap=0, yaxis_title="count (approx.)")
+    return fig
+
+
+def box_from_sketches(sketches_by_group, y_title, title):
+    # Box plots drawn from quantile sketches: whiskers at the 1.5 IQR fences, clipped to min/max
+    fig = go.Figure()
+    colors = px.colors.qualitative.Set3
+    for idx, (group, kll) in enumerate(sketches_by_group.items()):
+        q1, median, q3 = kll.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        fig.add_trace(go.Box(
+            name=group,
+            q1=[q1],
+            median=[median],
+            q3=[q3],
+            lowerfence=[max(kll.min, q1 - 1.5 * iqr)],
+            upperfence=[min(kll.max, q3 + 1.5 * iqr)],
+            marker_color=colors[idx % len(colors)]
+        ))
+    fig.update_layout(title=title, yaxis_title=y_title, showlegend=False)
+    return fig
@@ -0,0 +1,182 @@
+"""Dataset generation and the data path behind each page of inblooms.py.
+
+Everything here is plain pandas/numpy with no Streamlit calls, so the pages
+can be benchmarked headlessly (see benchmarks/bench_pages.py).
+"""
+import numpy as np
+import pandas as pd
+
+EVENTS = ["Solo Dance", "Group Dance", "Singing", "Drama", "Debate",
+          "Photography", "Poetry", "Fashion Show", "Quiz", "Treasure Hunt"]
+DAYS = ["Day 1", "Day 2", "Day 3", "Day 4", "Day 5"]
+COLLEGES = ["College A", "College B", "College C", "College D", "College E"]
+STATES = [
+    "Maharashtra", "Karnataka", "Tamil Nadu", "Kerala",
+    "Gujarat", "Delhi", "Uttar Pradesh", "West Bengal",
+    "Rajasthan", "Madhya Pradesh", "Punjab", "Telangana"
+]
+FEEDBACK_OPTIONS = [
+    "Amazing event, really enjoyed it!",
+    "Could be better organized.",
+    "Loved the performance!",
+    "Not up to the mark.",
+    "Had a great time with friends.",
+    "The event was too long.",
+    "Well organized and fun.",
+    "Disappointing experience.",
+    "Incredible talent showcased.",
+    "Needs improvement in planning."
+]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Casey", "Drew", "Jamie", "Robin", "Riley", "Cameron",
+               "Aditya", "Priya", "Raj", "Neha", "Vikram", "Anjali", "Arjun", "Divya", "Karthik", "Meera"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Rodriguez", "Wilson",
+              "Sharma", "Patel", "Kumar", "Singh", "Gupta", "Reddy", "Verma", "Shah", "Joshi", "Nair"]
+GENDERS = ["Male", "Female", "Non-binary"]
+REGISTRATION_TYPES = ["Online", "On-site"]
+
+# Every possible "HH:MM" slot between 10:00 and 18:59
+TIME_SLOTS = [f"{hour:02d}:{minute:02d}" for hour in range(10, 19) for minute in range(60)]
+
+POSITIVE_WORDS = {'excellent', 'amazing', 'great', 'good', 'wonderful', 'fantastic'}
+NEGATIVE_WORDS = {'poor', 'bad', 'disappointing', 'terrible', 'awful', 'horrible'}
+
+
+# ------------------ Dataset Generation ------------------
+def generate_dataset(n_rows=250, seed=None):
+    rng = np.random.default_rng(seed)
+
+    def pick(options):
+        return np.asarray(options, dtype=object)[rng.integers(0, len(options), n_rows)]
+
+    names = pd.Series(pick(FIRST_NAMES)) + " " + pd.Series(pick(LAST_NAMES))
+
+    df = pd.DataFrame({
+        "ParticipantID": [f"P{i:03d}" for i in range(1, n_rows + 1)],
+        "Name": names.to_numpy(),
+        "Age": rng.integers(18, 26, n_rows),            # Typical college age
+        "Gender": pick(GENDERS),
+        "College": pick(COLLEGES),
+        "State": pick(STATES),
+        "Event": pick(EVENTS),
+        "Day": pick(DAYS),
+        "Time": pick(TIME_SLOTS),
+        "Score": rng.integers(60, 101, n_rows),         # Performance/participation score
+        "Registration": pick(REGISTRATION_TYPES),
+        "Satisfaction": rng.integers(1, 6, n_rows),     # 5-point scale
+        "Feedback": pick(FEEDBACK_OPTIONS),
+        "TotalUsers": rng.integers(2500, 3501, n_rows),
+    })
+    return df
+
+
+def dataset_version(df):
+    # Content hash, so identical tables map to the same derived artifacts
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return f"{int(hashes.sum(dtype=np.uint64)):016x}"
+
+
+def value_counts(series):
+    # Categorical columns (see inbloom.shared) also report unobserved categories
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+# ------------------ Home ------------------
+def featured_event_stats(df, events):
+    featured = df[df["Event"].isin(events)]
+    grouped = featured.groupby("Event", observed=True)
+    participants = grouped.size()
+    avg_scores = grouped["Score"].mean().round(1)
+    days = grouped["Day"].unique()
+
+    stats = {}
+    for event in events:
+        stats[event] = {
+            "participants": int(participants.get(event, 0)),
+            "avg_score": float(avg_scores.get(event, np.nan)),
+            "days": list(days.get(event, [])),
+        }
+    return stats
+
+
+def top_performers(df, n=10):
+    return df.nlargest(n, "Score", keep="first")
+
+
+def event_schedule(df):
+    schedule = df.groupby(["Day", "Event"], observed=True).size().reset_index(name="Participants")
+    return schedule.sort_values(["Day", "Participants"], ascending=[True, False])
+
+
+# ------------------ Dashboard ------------------
+def filter_dataset(df, events=None, states=None, colleges=None, days=None):
+    mask = np.ones(len(df), dtype=bool)
+    for column, selected in (("Event", events), ("State", states), ("College", colleges), ("Day", days)):
+        if selected is not None:
+            mask &= df[column].isin(selected).to_numpy()
+    return df[mask]
+
+
+def dashboard_aggregates(filtered_df):
+    return {
+        "participants": len(filtered_df),
+        "colleges": filtered_df["College"].nunique(),
+        "avg_score": filtered_df["Score"].mean(),
+        "satisfaction": filtered_df["Satisfaction"].mean(),
+        "events": filtered_df["Event"].nunique(),
+        "days": filtered_df["Day"].nunique(),
+        "event_participation": value_counts(filtered_df["Event"]),
+        "day_trend": filtered_df.groupby("Day", observed=True).size().reset_index(name="count"),
+        "avg_scores": filtered_df.groupby("Event", observed=True)["Score"].mean().sort_values(ascending=True),
+        "gender_dist": value_counts(filtered_df["Gender"]),
+    }
+
+
+# ------------------ Text Analysis ------------------
+def feedback_text(df, event):
+    return df.loc[df["Event"] == event, "Feedback"].str.cat(sep=" ")
+
+
+def build_wordcloud(text, background_color="#ffffff", min_word_length=4):
+    from wordcloud import WordCloud
+
+    return WordCloud(
+        width=800,
+        height=400,
+        background_color=background_color,
+        min_word_length=min_word_length,
+        colormap='viridis'
+    ).generate(text)
+
+
+def build_wordcloud_from_frequencies(frequencies, background_color="#ffffff", min_word_length=4):
+    from wordcloud import WordCloud
+
+    frequencies = {word: count for word, count in frequencies.items() if len(word) >= min_word_length}
+    return WordCloud(
+        width=800,
+        height=400,
+        background_color=background_color,
+        colormap='viridis'
+    ).generate_from_frequencies(frequencies)
+
+
+def analyze_sentiment(text):
+    words = set(text.lower().split())
+    pos_count = len(words.intersection(POSITIVE_WORDS))
+    neg_count = len(words.intersection(NEGATIVE_WORDS))
+    return 'Positive' if pos_count > neg_count else 'Negative' if neg_count > pos_count else 'Neutral'
+
+
+def sentiment_counts(df):
+    # Feedback comes from a small set of phrases, so score each distinct phrase once
+    feedback_counts = value_counts(df["Feedback"])
+    labels = [analyze_sentiment(feedback) for feedback in feedback_counts.index]
+    return feedback_counts.groupby(np.asarray(labels, dtype=object)).sum().sort_values(ascending=False)
+
+
+# ------------------ Event Schedule ------------------
+def schedule_table(df):
+    schedule = df.groupby(["Day", "Event", "Time"], observed=True).size().reset_index(name="Participants")
+    return schedule.sort_values(["Day", "Time"])
+
@@ -0,0 +1,119 @@
+"""Lightweight timing spans and cache counters for the InBloom app.
+
+Enable with ``INBLOOM_DIAGNOSTICS=1``.  When disabled, ``span()`` hands back a
+shared no-op context manager, so instrumented code pays one function call.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+ENABLED = os.environ.get("INBLOOM_DIAGNOSTICS", "").lower() in ("1", "true", "yes", "on")
+
+# Keep the most recent samples per span so memory stays bounded on long runs
+MAX_SAMPLES = 2048
+
+_NULL_SPAN = nullcontext()
+
+
+class Recorder:
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        self._cache = {}
+
+    def add(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+                self._counts[name] = 0
+            samples.append(seconds)
+            self._counts[name] += 1
+
+    def cache(self, name, hit):
+        with self._lock:
+            hits, misses = self._cache.get(name, (0, 0))
+            self._cache[name] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._cache.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {name: np.fromiter(values, dtype=float) * 1000 for name, values in self._samples.items()}
+            counts = dict(self._counts)
+            cache = dict(self._cache)
+
+        spans = {}
+        for name, ms in sorted(samples.items()):
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            spans[name] = {
+                "count": counts[name],
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(float(ms.max()), 3),
+                "total_ms": round(float(ms.sum()), 3),
+            }
+
+        caches = {}
+        for name, (hits, misses) in sorted(cache.items()):
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            }
+        return {"spans": spans, "caches": caches}
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        recorder.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# One recorder per server process, shared by every session
+recorder = Recorder()
+
+
+def span(name):
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record_cache(name, hit):
+    if ENABLED:
+        recorder.cache(name, hit)
+
+
+# For sections that are too long to wrap in a ``with`` block
+def start_span():
+    return time.perf_counter() if ENABLED else None
+
+
+def end_span(name, started):
+    if started is not None:
+        recorder.add(name, time.perf_counter() - started)
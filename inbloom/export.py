@@ -0,0 +1,233 @@
+"""Chunked, background export of a filtered slice of the participant table.
+
+A slice is passed as row positions into the session's DataFrame, and only one
+chunk of it is materialized at a time, so a multi-million-row export never
+holds the slice in memory next to the table.  ``start_export()`` runs the
+write on a small shared thread pool and returns an ``ExportJob`` whose
+progress a page can poll on its reruns.
+
+CSV is written through gzip or zstd streams (zstd needs the optional
+``zstandard`` package); Parquet and Feather use Arrow's built-in codecs;
+Excel is written in xlsxwriter's constant-memory mode and is never
+compressed further, as .xlsx is already a zip archive.
+"""
+import gzip
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+FORMATS = {"CSV": ".csv", "Parquet": ".parquet", "Feather": ".feather", "Excel": ".xlsx"}
+MIME_TYPES = {
+    "CSV": "text/csv",
+    "Parquet": "application/vnd.apache.parquet",
+    "Feather": "application/vnd.apache.arrow.file",
+    "Excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+COMPRESSIONS = ["none", "gzip", "zstd"]
+SUPPORTED_COMPRESSIONS = {
+    "CSV": ["none", "gzip", "zstd"],
+    "Parquet": ["none", "gzip", "zstd"],
+    "Feather": ["none", "zstd"],
+    "Excel": ["none"],
+}
+
+CHUNK_ROWS = int(os.environ.get("INBLOOM_EXPORT_CHUNK_ROWS", "100000"))
+EXCEL_MAX_ROWS = 1_048_575   # one row of the sheet is the header
+EXPORT_DIR = os.environ.get("INBLOOM_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "inbloom-exports")
+
+# Shared by every session in the process; extra exports queue instead of piling on threads
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="inbloom-export")
+
+
+class ExportJob:
+    def __init__(self, fmt, compression, total_rows, path):
+        self.fmt = fmt
+        self.compression = compression
+        self.total_rows = total_rows
+        self.path = path
+        self.rows_written = 0
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self._cancelled = threading.Event()
+        self._data = None
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def progress(self):
+        return self.rows_written / self.total_rows if self.total_rows else 1.0
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def nbytes(self):
+        # The finished file once read() has loaded it for the download button
+        return len(self._data) if self._data is not None else 0
+
+    def read(self):
+        # The finished file, read from disk once and reused on every later rerun
+        if self._data is None:
+            with open(self.path, "rb") as fh:
+                self._data = fh.read()
+        return self._data
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def discard(self):
+        # Stop the job if it is still running and remove whatever it wrote
+        self.cancel()
+        self._data = None
+        if self.done:
+            shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+    def _advance(self, rows):
+        if self._cancelled.is_set():
+            raise InterruptedError("Export cancelled")
+        self.rows_written += rows
+
+
+def file_name(fmt, compression, stem="inbloom_export"):
+    suffix = FORMATS[fmt]
+    if fmt == "CSV" and compression == "gzip":
+        suffix += ".gz"
+    elif fmt == "CSV" and compression == "zstd":
+        suffix += ".zst"
+    return stem + suffix
+
+
+def chunks(df, rows, chunk_rows=CHUNK_ROWS):
+    # rows=None exports the whole frame
+    total = len(df) if rows is None else len(rows)
+    for start in range(0, total, chunk_rows):
+        stop = min(start + chunk_rows, total)
+        yield df.iloc[start:stop] if rows is None else df.iloc[rows[start:stop]]
+
+
+def write_slice(df, rows, path, fmt, compression="none", chunk_rows=CHUNK_ROWS, on_chunk=None):
+    if compression not in SUPPORTED_COMPRESSIONS[fmt]:
+        raise ValueError(f"{fmt} export does not support {compression} compression")
+    total = len(df) if rows is None else len(rows)
+    if fmt == "Excel" and total > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows; this slice has {total:,}")
+    writer = _WRITERS[fmt]
+    writer(df, chunks(df, rows, chunk_rows), path, compression, on_chunk or (lambda n: None))
+
+
+def _write_csv(df, chunk_iter, path, compression, on_chunk):
+    with _open_binary(path, compression) as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as fh:
+        header = True
+        for chunk in chunk_iter:
+            chunk.to_csv(fh, index=False, header=header)
+            header = False
+            on_chunk(len(chunk))
+        if header:
+            df.iloc[:0].to_csv(fh, index=False)
+
+
+def _open_binary(path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImportError("zstd-compressed CSV export needs the 'zstandard' package") from exc
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+def _arrow_schema(df, chunk_iter):
+    # An empty object column has no Arrow type, so the schema is read off the
+    # first chunk; columns that are still all-null there are written as strings
+    import pyarrow as pa
+
+    first = next(chunk_iter, None)
+    schema = pa.Schema.from_pandas(df.iloc[:0] if first is None else first, preserve_index=False)
+    for index, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(index, field.with_type(pa.string()))
+    return schema, chunk_iter if first is None else itertools.chain([first], chunk_iter)
+
+
+def _write_parquet(df, chunk_iter, path, compression, on_chunk):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema, chunk_iter = _arrow_schema(df, chunk_iter)
+    codec = None if compression == "none" else compression
+    with pq.ParquetWriter(path, schema, compression=codec) as writer:
+        for chunk in chunk_iter:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            on_chunk(len(chunk))
+
+
+def _write_feather(df, chunk_iter, path, compression, on_chunk):
+    # Feather v2 is the Arrow IPC file format written batch by batch
+    import pyarrow as pa
+
+    schema, chunk_iter = _arrow_schema(df, chunk_iter)
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for chunk in chunk_iter:
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            on_chunk(len(chunk))
+
+
+def _write_excel(df, chunk_iter, path, compression, on_chunk):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk once the next one starts
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet("InBloom_Data")
+        sheet.write_row(0, 0, list(df.columns))
+        row = 1
+        for chunk in chunk_iter:
+            for values in chunk.itertuples(index=False, name=None):
+                sheet.write_row(row, 0, values)
+                row += 1
+            on_chunk(len(chunk))
+    finally:
+        workbook.close()
+
+
+_WRITERS = {"CSV": _write_csv, "Parquet": _write_parquet, "Feather": _write_feather, "Excel": _write_excel}
+
+
+def start_export(df, rows, fmt, compression="none", chunk_rows=CHUNK_ROWS, stem="inbloom_export"):
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    directory = os.path.join(EXPORT_DIR, uuid.uuid4().hex)
+    os.makedirs(directory)
+    rows = None if rows is None else np.asarray(rows)
+    total = len(df) if rows is None else len(rows)
+    job = ExportJob(fmt, compression, total, os.path.join(directory, file_name(fmt, compression, stem)))
+    _executor.submit(_run, job, df, rows, chunk_rows)
+    return job
+
+
+def _run(job, df, rows, chunk_rows):
+    partial = job.path + ".part"
+    try:
+        write_slice(df, rows, partial, job.fmt, job.compression, chunk_rows, on_chunk=job._advance)
+        os.replace(partial, job.path)
+    except Exception as exc:
+        job.error = exc
+        if os.path.exists(partial):
+            os.remove(partial)
+    finally:
+        job.finished = time.time()
+        if job._cancelled.is_set():
+            shutil.rmtree(os.path.dirname(job.path), ignore_errors=True)
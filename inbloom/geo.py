@@ -0,0 +1,88 @@
+"""State geometry and per-state aggregation for the Home choropleth.
+
+``india_states.geojson`` ships coarse outlines of the twelve states that
+``generate_dataset()`` draws from, already in the lon/lat coordinates Plotly
+draws with and with exterior rings wound clockwise as d3-geo expects, so
+nothing is reprojected or rewound at runtime.  ``load_states()`` reads the
+file once per tolerance and thins it with Douglas-Peucker, which keeps the
+figure payload small.
+"""
+import copy
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+GEOJSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "india_states.geojson")
+FEATURE_ID_KEY = "properties.name"
+
+# Simplification tolerance in degrees, selectable from the Home page
+TOLERANCES = {"Detailed": 0.0, "Balanced": 0.1, "Light": 0.25}
+
+
+@functools.lru_cache(maxsize=1)
+def _raw_states():
+    with open(GEOJSON_PATH) as fh:
+        return json.load(fh)
+
+
+@functools.lru_cache(maxsize=len(TOLERANCES) + 1)
+def load_states(tolerance=0.0):
+    # Cached per tolerance; callers must treat the returned dict as read-only
+    geojson = copy.deepcopy(_raw_states())
+    if tolerance > 0:
+        for feature in geojson["features"]:
+            geometry = feature["geometry"]
+            polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+            simplified = [[simplify_ring(ring, tolerance) for ring in polygon] for polygon in polygons]
+            geometry["coordinates"] = simplified if geometry["type"] == "MultiPolygon" else simplified[0]
+    return geojson
+
+
+def state_names():
+    return [feature["properties"]["name"] for feature in _raw_states()["features"]]
+
+
+def simplify_ring(ring, tolerance):
+    # Douglas-Peucker on a closed ring; never drops below a triangle
+    points = np.asarray(ring, dtype=np.float64)
+    if len(points) <= 4:
+        return ring
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    # A closed ring starts and ends on the same point, so split it at the farthest vertex first
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep[far] = True
+    stack = [(0, far), (far, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = _segment_distances(points[start + 1:end], points[start], points[end])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            middle = start + 1 + index
+            keep[middle] = True
+            stack.extend(((start, middle), (middle, end)))
+    if keep.sum() < 4:
+        return ring
+    return points[keep].round(3).tolist()
+
+
+def _segment_distances(points, a, b):
+    ab = b - a
+    length = np.dot(ab, ab)
+    if length == 0:
+        return np.hypot(*(points - a).T)
+    t = np.clip((points - a) @ ab / length, 0, 1)
+    return np.hypot(*(points - (a + t[:, None] * ab)).T)
+
+
+def state_counts(df):
+    # Participants per state in geometry order, zero-filled so every state is drawn
+    names = state_names()
+    codes = pd.Categorical(np.asarray(df["State"]), categories=names).codes
+    counts = np.bincount(codes[codes >= 0], minlength=len(names))
+    return pd.DataFrame({"State": names, "Count": counts})
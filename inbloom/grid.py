@@ -0,0 +1,73 @@
+"""Server-side paging, sorting, filtering and stratified sampling for the raw table.
+
+Only the requested page (or sample) is materialized as a DataFrame, so what
+the Dataset Explorer sends to the browser stays the same size however large
+the participant table grows.
+"""
+import numpy as np
+import pandas as pd
+
+STRATA_COLUMNS = ("Event", "Day")
+
+
+def sort_order(df, column, ascending=True):
+    # Row positions in sorted order; callers cache this per dataset version
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.codes
+    order = np.argsort(values.to_numpy(), kind="stable")
+    return order if ascending else order[::-1]
+
+
+def filter_mask(df, filters):
+    # filters maps a column to a list of values, a (low, high) range, or a substring
+    mask = np.ones(len(df), dtype=bool)
+    for column, condition in (filters or {}).items():
+        values = df[column]
+        if isinstance(condition, tuple):
+            low, high = condition
+            mask &= ((values >= low) & (values <= high)).to_numpy()
+        elif isinstance(condition, str):
+            if condition:
+                mask &= values.astype(str).str.contains(condition, case=False, regex=False).to_numpy()
+        else:
+            mask &= values.isin(condition).to_numpy()
+    return mask
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def page(df, page_number=0, page_size=100, order=None, mask=None):
+    if order is None:
+        rows = np.flatnonzero(mask) if mask is not None else None
+    else:
+        rows = order[mask[order]] if mask is not None else order
+
+    total = len(df) if rows is None else len(rows)
+    page_number = min(max(page_number, 0), page_count(total, page_size) - 1)
+    start = page_number * page_size
+    stop = min(start + page_size, total)
+
+    if rows is None:
+        return df.iloc[start:stop]
+    return df.iloc[rows[start:stop]]
+
+
+def stratified_sample(df, n=500, by=STRATA_COLUMNS, seed=0, mask=None):
+    # Proportional allocation across strata, at least one row from every non-empty stratum
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(df))
+    if len(candidates) <= n:
+        return df.iloc[candidates]
+
+    codes = df.iloc[candidates].groupby(list(by), observed=True, sort=False).ngroup().to_numpy()
+    sizes = np.bincount(codes)
+    allocation = np.maximum(np.floor(sizes * n / len(candidates)).astype(np.int64), 1)
+
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(codes)), codes))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    position = np.arange(len(order)) - starts[codes[order]]
+    chosen = np.sort(candidates[order[position < allocation[codes[order]]]])
+    return df.iloc[chosen]
@@ -0,0 +1,279 @@
+"""Photo filters for the Image Processing page and a disk cache of their output.
+
+``ProcessedImageCache`` is content-addressed: the key is the SHA-256 of the
+uploaded bytes plus every processing setting, so the same photo uploaded by
+different people in different sessions is decoded and filtered only once.
+Entries are PNG (or animated GIF) files under one directory, evicted least
+recently used once the directory exceeds its byte budget.  The directory is
+the source of truth: file mtimes record last use and every write rescans it,
+so worker processes sharing the directory share one budget.
+
+Images above ``TILE_THRESHOLD_PIXELS`` are filtered in overlapping tiles on a
+small thread pool and stitched into one output, so the filter and enhance
+chain never holds more than a few tiles of intermediates next to the input
+and output.  Contrast is applied in a second pass against the whole image's
+mean, which keeps the result identical to the untiled chain.  Multi-frame
+uploads (animated GIFs) are decoded and filtered one frame at a time and saved
+as an animated GIF.  Pillow's GIF writer still keeps every palettized output
+frame (about a byte per pixel each) until it writes the file, so memory for an
+animation grows with its frame count; only the RGBA intermediates do not.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps, ImageStat
+
+from inbloom import diagnostics
+
+FILTERS = ["Original", "Grayscale", "Blur", "Edge Enhance", "Sharpen", "Emboss"]
+# Longest side in pixels; None keeps the upload's resolution
+OUTPUT_SIZES = {"Original": None, "Large (1920px)": 1920, "Medium (1280px)": 1280, "Small (640px)": 640}
+
+CACHE_DIR = os.environ.get("INBLOOM_IMAGE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "inbloom-image-cache")
+CACHE_MAX_BYTES = int(float(os.environ.get("INBLOOM_IMAGE_CACHE_MB", "512")) * 2**20)
+CACHE_SUFFIX = ".img"
+
+TILE_THRESHOLD_PIXELS = int(float(os.environ.get("INBLOOM_TILE_THRESHOLD_MP", "16")) * 1_000_000)
+TILE_SIZE = 1024
+# Wide enough for the largest kernel (BLUR is 5x5), so tile edges see real neighbours
+TILE_OVERLAP = 4
+TILE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Pillow releases the GIL inside filters and blends, so tiles run in parallel
+_tile_executor = ThreadPoolExecutor(max_workers=TILE_WORKERS, thread_name_prefix="inbloom-tiles")
+
+_FILTER_KERNELS = {
+    "Blur": ImageFilter.BLUR,
+    "Edge Enhance": ImageFilter.EDGE_ENHANCE,
+    "Sharpen": ImageFilter.SHARPEN,
+    "Emboss": ImageFilter.EMBOSS,
+}
+
+
+def _prepare(img, max_size):
+    if img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    if max_size is not None and max(img.size) > max_size:
+        # Resize first so the filters run on the smaller image
+        img = img.copy()
+        img.thumbnail((max_size, max_size))
+    return img
+
+
+def _filter_and_brighten(img, filter_option, brightness):
+    # Apply selected filter
+    if filter_option == "Grayscale":
+        img = ImageOps.grayscale(img)
+    elif filter_option in _FILTER_KERNELS:
+        img = img.filter(_FILTER_KERNELS[filter_option])
+    return ImageEnhance.Brightness(img).enhance(brightness)
+
+
+def apply_filters(img, filter_option, brightness, contrast, max_size=None):
+    img = _prepare(img, max_size)
+    if img.width * img.height > TILE_THRESHOLD_PIXELS:
+        return apply_filters_tiled(img, filter_option, brightness, contrast)
+    img = _filter_and_brighten(img, filter_option, brightness)
+    return ImageEnhance.Contrast(img).enhance(contrast)
+
+
+def tile_boxes(width, height, tile_size=TILE_SIZE):
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            yield (left, top, min(left + tile_size, width), min(top + tile_size, height))
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _map_tiles(func, boxes):
+    # At most two tiles per worker in flight, so intermediates stay bounded
+    for batch in _batched(boxes, TILE_WORKERS * 2):
+        yield from _tile_executor.map(func, batch)
+
+
+def apply_filters_tiled(img, filter_option, brightness, contrast, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    img.load()
+    width, height = img.size
+    mode = "L" if filter_option == "Grayscale" else img.mode
+    output = Image.new(mode, img.size)
+    boxes = list(tile_boxes(width, height, tile_size))
+
+    def filter_tile(box):
+        left, top, right, bottom = box
+        padded = (max(left - overlap, 0), max(top - overlap, 0), min(right + overlap, width), min(bottom + overlap, height))
+        tile = _filter_and_brighten(img.crop(padded), filter_option, brightness)
+        # Drop the overlap again, keeping only this tile's own pixels
+        offset_x, offset_y = left - padded[0], top - padded[1]
+        tile = tile.crop((offset_x, offset_y, offset_x + right - left, offset_y + bottom - top))
+        return box, tile, ImageStat.Stat(tile.convert("L")).sum[0]
+
+    # Pass 1: filter and brighten each tile, summing luminance for the contrast mean
+    luminance = 0.0
+    for box, tile, tile_sum in _map_tiles(filter_tile, boxes):
+        output.paste(tile, box[:2])
+        luminance += tile_sum
+    if contrast == 1.0:
+        return output
+
+    # Pass 2: ImageEnhance.Contrast blends towards the mean grey of the whole image
+    mean = int(luminance / (width * height) + 0.5)
+
+    def contrast_tile(box):
+        tile = output.crop(box)
+        degenerate = Image.new("L", tile.size, mean).convert(tile.mode)
+        if "A" in tile.getbands():
+            degenerate.putalpha(tile.getchannel("A"))
+        return box, Image.blend(degenerate, tile, contrast)
+
+    for box, tile in _map_tiles(contrast_tile, boxes):
+        output.paste(tile, box[:2])
+    return output
+
+
+def iter_frames(img):
+    # One decoded frame at a time; Pillow composites GIF disposal on seek
+    for index in range(getattr(img, "n_frames", 1)):
+        img.seek(index)
+        yield img.convert("RGBA"), img.info.get("duration", 100)
+
+
+def process_bytes(data, filter_option, brightness, contrast, max_size=None):
+    img = Image.open(BytesIO(data))
+    buffer = BytesIO()
+    if getattr(img, "n_frames", 1) > 1:
+        durations = []
+
+        def processed_frames():
+            for frame, duration in iter_frames(img):
+                durations.append(duration)
+                yield apply_filters(frame, filter_option, brightness, contrast, max_size)
+
+        frames = processed_frames()
+        first = next(frames)
+        # The GIF writer pulls append_images one at a time, so durations fill in as
+        # frames are read, but it collects every frame before writing the first
+        first.save(
+            buffer,
+            format="GIF",
+            save_all=True,
+            append_images=frames,
+            duration=durations,
+            loop=img.info.get("loop", 0),
+            disposal=2,
+        )
+    else:
+        img = apply_filters(img, filter_option, brightness, contrast, max_size)
+        img.save(buffer, format="PNG", compress_level=3)
+    return buffer.getvalue()
+
+
+def output_extension(data):
+    return "gif" if data[:6] in (b"GIF87a", b"GIF89a") else "png"
+
+
+def cache_key(data, filter_option, brightness, contrast, max_size=None):
+    content = hashlib.sha256(data).hexdigest()
+    settings = f"{filter_option}|{brightness:.3f}|{contrast:.3f}|{max_size}"
+    return hashlib.sha256(f"{content}|{settings}".encode()).hexdigest()
+
+
+class ProcessedImageCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> size, least recently used first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        # Rebuild the index from disk, oldest access first, so entries other
+        # processes wrote count against the budget too
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue   # Evicted by another process meanwhile
+                    found.append((stat.st_mtime, entry.name[:-len(CACHE_SUFFIX)], stat.st_size))
+        self._entries.clear()
+        self._total = 0
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            # mtime doubles as the last-use time when a process rescans
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing, or evicted by another process between the read and the utime
+            data = b""
+        if not data:
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total -= size
+            diagnostics.record_cache("processed images", False)
+            return None
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = len(data)
+                self._total += len(data)
+            self._entries.move_to_end(key)
+        diagnostics.record_cache("processed images", True)
+        return data
+
+    def put(self, key, data):
+        handle, partial = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        with os.fdopen(handle, "wb") as fh:
+            fh.write(data)
+        os.replace(partial, self._path(key))
+        with self._lock:
+            self._scan()
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total, "max_bytes": self.max_bytes}
+
+    def processed(self, data, filter_option, brightness, contrast, max_size=None):
+        key = cache_key(data, filter_option, brightness, contrast, max_size)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        result = process_bytes(data, filter_option, brightness, contrast, max_size)
+        self.put(key, result)
+        return result
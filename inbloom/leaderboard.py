@@ -0,0 +1,130 @@
+"""Per-group leaderboards with tie-aware ranks and percentiles.
+
+Built once per dataset with one lexsort: every group's top K rows, their
+competition ranks ("1, 2, 2, 4") and percentiles are stored, so serving a
+leaderboard is O(K).  ``update_score()`` only touches the groups the
+participant belongs to, keeping a sorted score array per group up to date
+and re-selecting that group's top K with an O(n) ``np.partition``.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+GROUP_COLUMNS = ("Event", "College", "Day")
+OVERALL = "Overall"
+DISPLAY_COLUMNS = ["ParticipantID", "Name", "Event", "College", "Day"]
+
+
+class Leaderboard:
+    def __init__(self, df, group_columns=GROUP_COLUMNS, k=10):
+        self.k = k
+        self._lock = threading.Lock()
+        self._df = df
+        self._scores = df["Score"].to_numpy(dtype=np.float64).copy()
+        self._row_of = pd.Index(df["ParticipantID"])
+
+        self._codes = {}
+        self._groups = {}
+        self._members = {}
+        self._sorted = {}
+        self._top = {}
+
+        for by in (OVERALL,) + tuple(group_columns):
+            if by == OVERALL:
+                codes, groups = np.zeros(len(df), dtype=np.int64), [OVERALL]
+            else:
+                codes, uniques = pd.factorize(df[by], sort=True)
+                groups = list(uniques)
+            self._codes[by] = codes
+            self._groups[by] = {group: code for code, group in enumerate(groups)}
+            self._build(by, codes, len(groups))
+
+    def _build(self, by, codes, n_groups):
+        scores = self._scores
+        n = len(scores)
+        # Group by code, best score first, ties in table order
+        order = np.lexsort((np.arange(n), -scores, codes))
+        codes_sorted = codes[order]
+        scores_sorted = scores[order]
+
+        sizes = np.bincount(codes, minlength=n_groups)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        # Competition rank: position of the first equal score within the group
+        is_new = np.ones(n, dtype=bool)
+        is_new[1:] = (codes_sorted[1:] != codes_sorted[:-1]) | (scores_sorted[1:] != scores_sorted[:-1])
+        first_pos = np.maximum.accumulate(np.where(is_new, np.arange(n), 0))
+        ranks = first_pos - starts[codes_sorted] + 1
+        group_sizes = sizes[codes_sorted]
+        percentiles = (group_sizes - ranks + 1) / group_sizes * 100
+
+        members, sorted_scores, top = [], [], []
+        for code in range(n_groups):
+            start, end = starts[code], starts[code] + sizes[code]
+            members.append(order[start:end])
+            sorted_scores.append(scores_sorted[start:end][::-1])   # ascending
+            head = slice(start, min(end, start + self.k))
+            top.append((order[head], ranks[head], percentiles[head]))
+
+        self._members[by] = members
+        self._sorted[by] = sorted_scores
+        self._top[by] = top
+
+    def groups(self, by):
+        return list(self._groups[by])
+
+    def top(self, by=OVERALL, group=OVERALL):
+        with self._lock:
+            rows, ranks, percentiles = self._top[by][self._groups[by][group]]
+            scores = self._scores[rows]
+        board = self._df.iloc[rows][DISPLAY_COLUMNS].reset_index(drop=True)
+        board.insert(0, "Rank", ranks)
+        board["Score"] = scores
+        board["Percentile"] = np.round(percentiles, 1)
+        return board
+
+    def rank_of(self, participant_id, by=OVERALL):
+        # (rank, percentile) of one participant within their group
+        row = self._row_of.get_loc(participant_id)
+        with self._lock:
+            ascending = self._sorted[by][self._codes[by][row]]
+            at_or_below = np.searchsorted(ascending, self._scores[row], side="right")
+        return int(len(ascending) - at_or_below + 1), at_or_below / len(ascending) * 100
+
+    def update_score(self, participant_id, score):
+        row = self._row_of.get_loc(participant_id)
+        with self._lock:
+            old = self._scores[row]
+            if old == score:
+                return
+            self._scores[row] = score
+            for by, codes in self._codes.items():
+                self._update_group(by, codes[row], old, score)
+
+    def _update_group(self, by, code, old, score):
+        # O(group size) array shifts instead of re-sorting the group
+        ascending = self._sorted[by][code]
+        ascending = np.delete(ascending, np.searchsorted(ascending, old, side="left"))
+        ascending = np.insert(ascending, np.searchsorted(ascending, score, side="left"), score)
+        self._sorted[by][code] = ascending
+        self._top[by][code] = self._select_top(self._members[by][code], ascending)
+
+    def _select_top(self, members, ascending):
+        scores = self._scores[members]
+        k = min(self.k, len(members))
+        if k < len(members):
+            # Everything above the K-th best score, then ties at the cut-off in table order
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)
+            tied = tied[np.argsort(members[tied], kind="stable")][:k - len(above)]
+            candidates = np.concatenate((above, tied))
+        else:
+            candidates = np.arange(len(members))
+        # Best first, ties in table order
+        candidates = candidates[np.lexsort((members[candidates], -scores[candidates]))]
+
+        n = len(ascending)
+        at_or_below = np.searchsorted(ascending, scores[candidates], side="right")
+        return members[candidates], n - at_or_below + 1, at_or_below / n * 100
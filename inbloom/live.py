@@ -0,0 +1,206 @@
+"""Live check-in and score feed with bounded rolling aggregates.
+
+Point ``INBLOOM_LIVE_FEED`` at a JSONL file that a scanner or judging app
+appends to, one event per line::
+
+    {"ts": 1745830000.5, "kind": "checkin", "event": "Singing", "day": "Day 1"}
+    {"ts": 1745830042.0, "kind": "score", "event": "Drama", "day": "Day 2", "score": 87}
+
+``ts`` (epoch seconds) is optional and defaults to the time the line is read.
+Lines that are not such an object, or whose timestamp or score is not a
+finite number in range, are counted as bad lines and skipped.
+Each poll only reads the bytes appended since the previous one, in blocks of
+``READ_BLOCK`` bytes, and folds them into fixed-size ring buffers, so memory
+grows with neither the stream nor the backlog a fresh process starts on.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+FEED_PATH = os.environ.get("INBLOOM_LIVE_FEED", "")
+REFRESH_SECONDS = float(os.environ.get("INBLOOM_LIVE_REFRESH_SECONDS", "5"))
+
+# Bytes read per block; a large backlog is folded in one block at a time
+READ_BLOCK = 1024 * 1024
+# Longest line we will buffer while waiting for its newline
+MAX_PARTIAL_LINE = 64 * 1024
+# Cap on distinct (Day, Event) keys so a malformed feed cannot grow the table
+MAX_DAY_EVENT_KEYS = 1024
+# Events stamped further ahead than this are rejected rather than moving the windows forward
+MAX_FUTURE_SECONDS = 24 * 3600
+# Scores are out of 100, as on the Dashboard
+SCORE_RANGE = (0.0, 100.0)
+
+
+class FileTailer:
+    def __init__(self, path):
+        self.path = path
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+
+    def read_lines(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        # Start over if the file was rotated or truncated
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._partial = b""
+
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            while self._offset < stat.st_size:
+                chunk = fh.read(min(READ_BLOCK, stat.st_size - self._offset))
+                if not chunk:
+                    break
+                self._offset += len(chunk)
+
+                lines = (self._partial + chunk).split(b"\n")
+                self._partial = lines.pop()
+                if len(self._partial) > MAX_PARTIAL_LINE:
+                    self._partial = b""
+                yield from (line for line in lines if line.strip())
+
+
+class RollingWindow:
+    """Counts and score sums in ``n_buckets`` buckets of ``bucket_seconds`` each."""
+
+    def __init__(self, bucket_seconds, n_buckets):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.checkins = np.zeros(n_buckets, dtype=np.int64)
+        self.scores = np.zeros(n_buckets, dtype=np.int64)
+        self.score_sum = np.zeros(n_buckets, dtype=np.float64)
+        self._latest = None
+
+    def _advance(self, bucket):
+        if self._latest is None:
+            self._latest = bucket
+            return
+        if bucket <= self._latest:
+            return
+        # Clear the slots the window moved past
+        stale = np.arange(self._latest + 1, min(bucket, self._latest + self.n_buckets) + 1) % self.n_buckets
+        self.checkins[stale] = 0
+        self.scores[stale] = 0
+        self.score_sum[stale] = 0
+        self._latest = bucket
+
+    def add(self, ts, checkins=0, score=None):
+        bucket = int(ts // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket <= self._latest - self.n_buckets:
+            return  # Older than the window
+        slot = bucket % self.n_buckets
+        self.checkins[slot] += checkins
+        if score is not None:
+            self.scores[slot] += 1
+            self.score_sum[slot] += score
+
+    def series(self, now=None):
+        # Oldest to newest, ending at the bucket containing ``now``
+        now = time.time() if now is None else now
+        self._advance(int(now // self.bucket_seconds))
+        buckets = np.arange(self._latest - self.n_buckets + 1, self._latest + 1)
+        slots = buckets % self.n_buckets
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_score = np.where(self.scores[slots] > 0, self.score_sum[slots] / self.scores[slots], np.nan)
+        return {
+            "start": buckets * self.bucket_seconds,
+            "checkins": self.checkins[slots].copy(),
+            "avg_score": avg_score,
+        }
+
+
+class LiveFeed:
+    def __init__(self, path):
+        self._tailer = FileTailer(path)
+        self._lock = threading.Lock()
+        self.per_minute = RollingWindow(60, 60)      # Last hour
+        self.per_hour = RollingWindow(3600, 24)      # Last day
+        # Keyed by (Day, Event); bounded by the festival's schedule, not the stream
+        self.per_day_event = {}
+        self.total_checkins = 0
+        self.total_scores = 0
+        self.score_sum = 0.0
+        self.bad_lines = 0
+
+    def _ingest(self, record, now):
+        if not isinstance(record, dict):
+            raise ValueError("event is not a JSON object")
+        ts = float(record.get("ts", now))
+        if not (math.isfinite(ts) and 0 <= ts <= now + MAX_FUTURE_SECONDS):
+            raise ValueError(f"timestamp {ts!r} out of range")
+        kind = record.get("kind")
+        if kind not in ("checkin", "score"):
+            raise ValueError(f"unknown event kind {kind!r}")
+        score = float(record["score"]) if kind == "score" else None
+        if score is not None and not (math.isfinite(score) and SCORE_RANGE[0] <= score <= SCORE_RANGE[1]):
+            raise ValueError(f"score {score!r} out of range")
+
+        key = (record.get("day"), record.get("event"))
+        totals = self.per_day_event.get(key)
+        if totals is None:
+            if len(self.per_day_event) >= MAX_DAY_EVENT_KEYS:
+                raise ValueError("too many distinct Day/Event keys")
+            totals = self.per_day_event[key] = [0, 0, 0.0]
+
+        if kind == "checkin":
+            self.total_checkins += 1
+            totals[0] += 1
+            for window in (self.per_minute, self.per_hour):
+                window.add(ts, checkins=1)
+        else:
+            self.total_scores += 1
+            self.score_sum += score
+            totals[1] += 1
+            totals[2] += score
+            for window in (self.per_minute, self.per_hour):
+                window.add(ts, score=score)
+
+    def poll(self):
+        with self._lock:
+            now = time.time()
+            for line in self._tailer.read_lines():
+                try:
+                    self._ingest(json.loads(line), now)
+                except (ValueError, KeyError, TypeError, OverflowError):
+                    self.bad_lines += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "total_checkins": self.total_checkins,
+                "total_scores": self.total_scores,
+                "avg_score": self.score_sum / self.total_scores if self.total_scores else None,
+                "per_minute": self.per_minute.series(),
+                "per_hour": self.per_hour.series(),
+                "per_day_event": {key: tuple(values) for key, values in self.per_day_event.items()},
+                "bad_lines": self.bad_lines,
+            }
+
+
+def selected_totals(snapshot, events, days):
+    # Live check-ins and scores restricted to the Dashboard's Event/Day filters
+    events, days = set(events), set(days)
+    checkins, scores, score_sum = 0, 0, 0.0
+    per_day = {}
+    for (day, event), (day_checkins, day_scores, day_score_sum) in snapshot["per_day_event"].items():
+        if day not in days or event not in events:
+            continue
+        checkins += day_checkins
+        scores += day_scores
+        score_sum += day_score_sum
+        per_day[day] = per_day.get(day, 0) + day_checkins
+    return {"checkins": checkins, "scores": scores, "score_sum": score_sum, "per_day": per_day}
@@ -0,0 +1,271 @@
+"""Per-session memory accounting, budgets and eviction.
+
+``SessionMemory`` is shared by every session in the process.  Sessions keep
+recomputable artifacts (their derived-data store, per-version view caches) in
+it instead of in ``st.session_state`` or a process-wide cache, so it can drop
+the least recently used ones when a session goes over
+``INBLOOM_SESSION_MEMORY_MB`` or the process over ``INBLOOM_MEMORY_BUDGET_MB``.
+Datasets are registered by content hash and sessions holding identical data
+share one DataFrame; an artifact's reference to its session's dataset is not
+counted again.  Things the app cannot recompute or free itself (datasets,
+uploads, finished exports) are counted but never evicted.  An artifact too large for the session budget on its own is kept
+and reported rather than evicted and rebuilt on every rerun.  Sessions idle
+for ``INBLOOM_SESSION_IDLE_SECONDS`` are forgotten.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+SESSION_BUDGET_BYTES = int(float(os.environ.get("INBLOOM_SESSION_MEMORY_MB", "64")) * 2**20)
+PROCESS_BUDGET_BYTES = int(float(os.environ.get("INBLOOM_MEMORY_BUDGET_MB", "1024")) * 2**20)
+IDLE_SECONDS = float(os.environ.get("INBLOOM_SESSION_IDLE_SECONDS", "1800"))
+
+Entry = namedtuple("Entry", ["kind", "value", "nbytes", "recomputable", "on_evict"])
+
+
+def current_session_id():
+    # "local" outside a Streamlit script run (benchmarks, bare mode)
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def estimate_size(obj, exclude=(), _seen=None):
+    # Deep size of what the app keeps around; objects in exclude (e.g. the
+    # dataset an artifact merely points at) are not counted
+    seen = {id(item) for item in exclude} if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return sys.getsizeof(obj)
+    nbytes = getattr(obj, "nbytes", None)
+    if callable(nbytes):
+        nbytes = nbytes()
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    if hasattr(obj, "getbands") and hasattr(obj, "size"):
+        # PIL image: one byte per band per pixel is close enough for 8-bit modes
+        width, height = obj.size
+        return width * height * len(obj.getbands())
+    if hasattr(obj, "to_array") and hasattr(obj, "layout_"):
+        # WordCloud keeps its layout and renders a width x height RGB array on demand
+        return obj.width * obj.height * 3 + sys.getsizeof(obj.layout_)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key, _seen=seen) + estimate_size(value, _seen=seen) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen=seen) for item in obj)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + estimate_size(vars(obj), _seen=seen)
+    return sys.getsizeof(obj)
+
+
+class SessionMemory:
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, process_budget=PROCESS_BUDGET_BYTES,
+                 idle_seconds=IDLE_SECONDS):
+        self.session_budget = session_budget
+        self.process_budget = process_budget
+        self.idle_seconds = idle_seconds
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()   # (session, name) -> Entry, least recently used first
+        self._last_seen = {}            # session -> last access time
+        self._datasets = {}             # content hash -> [DataFrame, nbytes, set of sessions]
+        self._session_dataset = {}      # session -> content hash
+        self._evictions = {}            # kind -> count
+        self._oversized = set()         # (session, name) kept although over the session budget
+
+    def touch(self, session):
+        with self._lock:
+            self._last_seen[session] = time.time()
+            self._prune_idle()
+
+    def get(self, session, name):
+        with self._lock:
+            entry = self._entries.get((session, name))
+            if entry is None:
+                return None
+            self._entries.move_to_end((session, name))
+            return entry.value
+
+    def put(self, session, name, value, kind, recomputable=True, on_evict=None):
+        with self._lock:
+            previous = self._entries.get((session, name))
+            self._discard((session, name), call_hook=previous is not None and previous.value is not value)
+            self._entries[(session, name)] = Entry(kind, value, self._size(session, value), recomputable, on_evict)
+            self._last_seen[session] = time.time()
+            self._enforce(session)
+        return value
+
+    def record(self, session, name, kind, nbytes):
+        # Accounting only, for memory the app cannot free itself (e.g. uploads)
+        with self._lock:
+            self._entries.pop((session, name), None)
+            self._entries[(session, name)] = Entry(kind, None, int(nbytes), False, None)
+            self._last_seen[session] = time.time()
+            self._enforce(session)
+
+    def get_or_create(self, session, name, kind, factory):
+        with self._lock:
+            value = self.get(session, name)
+            if value is None:
+                value = self.put(session, name, factory(), kind)
+            else:
+                # Artifacts such as a derived store grow after they are first stored
+                self.resize(session, name)
+            return value
+
+    def resize(self, session, name):
+        with self._lock:
+            entry = self._entries.get((session, name))
+            if entry is not None:
+                self._entries[(session, name)] = entry._replace(nbytes=self._size(session, entry.value))
+                self._enforce(session)
+
+    def _size(self, session, value):
+        # The session's dataset is accounted once, not again in every artifact pointing at it
+        content_hash = self._session_dataset.get(session)
+        exclude = [self._datasets[content_hash][0]] if content_hash is not None else []
+        return estimate_size(value, exclude=exclude)
+
+    def remove(self, session, name):
+        with self._lock:
+            self._discard((session, name), call_hook=True)
+
+    def share_dataset(self, session, content_hash, df):
+        # Return the DataFrame every session with this content should hold
+        with self._lock:
+            previous = self._session_dataset.get(session)
+            if previous == content_hash:
+                return self._datasets[content_hash][0]
+            if previous is not None:
+                self._release_dataset(session, previous)
+            if content_hash not in self._datasets:
+                self._datasets[content_hash] = [df, estimate_size(df), set()]
+            self._datasets[content_hash][2].add(session)
+            self._session_dataset[session] = content_hash
+            self._last_seen[session] = time.time()
+            return self._datasets[content_hash][0]
+
+    def _release_dataset(self, session, content_hash):
+        holders = self._datasets[content_hash][2]
+        holders.discard(session)
+        if not holders:
+            del self._datasets[content_hash]
+
+    def release_session(self, session):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session]:
+                self._discard(key, call_hook=True)
+            content_hash = self._session_dataset.pop(session, None)
+            if content_hash is not None:
+                self._release_dataset(session, content_hash)
+            self._last_seen.pop(session, None)
+
+    def _prune_idle(self):
+        cutoff = time.time() - self.idle_seconds
+        for session in [s for s, seen in self._last_seen.items() if seen < cutoff]:
+            self.release_session(session)
+
+    def _discard(self, key, call_hook):
+        self._oversized.discard(key)
+        entry = self._entries.pop(key, None)
+        if entry is not None and call_hook and entry.on_evict is not None:
+            entry.on_evict()
+        return entry
+
+    def _evict(self, key):
+        entry = self._discard(key, call_hook=True)
+        self._evictions[entry.kind] = self._evictions.get(entry.kind, 0) + 1
+
+    def _enforce(self, session):
+        # The session's own budget first, then the process budget across all sessions.
+        # An artifact that cannot fit next to what the session can never free is
+        # kept outside the session budget: evicting it would only have it rebuilt
+        # on the session's next rerun
+        room = self.session_budget - self._fixed_bytes(session)
+        budget = self.session_budget
+        for key, entry in self._entries.items():
+            if key[0] != session:
+                continue
+            if entry.recomputable and entry.nbytes > room:
+                self._oversized.add(key)
+                budget += entry.nbytes
+            else:
+                self._oversized.discard(key)
+        for key in list(self._entries):
+            if self._session_bytes(session) <= budget:
+                break
+            entry = self._entries[key]
+            if key[0] == session and entry.recomputable and entry.nbytes and key not in self._oversized:
+                self._evict(key)
+        for key in list(self._entries):
+            if self._process_bytes() <= self.process_budget:
+                break
+            entry = self._entries[key]
+            if entry.recomputable and entry.nbytes:
+                self._evict(key)
+
+    def _fixed_bytes(self, session):
+        # What eviction cannot free: the session's dataset and accounting-only entries
+        total = sum(
+            entry.nbytes for key, entry in self._entries.items() if key[0] == session and not entry.recomputable
+        )
+        content_hash = self._session_dataset.get(session)
+        if content_hash is not None:
+            total += self._datasets[content_hash][1]
+        return total
+
+    def _session_bytes(self, session):
+        total = sum(entry.nbytes for key, entry in self._entries.items() if key[0] == session)
+        content_hash = self._session_dataset.get(session)
+        if content_hash is not None:
+            total += self._datasets[content_hash][1]
+        return total
+
+    def _process_bytes(self):
+        # Shared datasets count once however many sessions hold them
+        return sum(entry.nbytes for entry in self._entries.values()) + sum(
+            nbytes for _, nbytes, _ in self._datasets.values()
+        )
+
+    def session_usage(self, session):
+        # Bytes per artifact kind held by one session
+        with self._lock:
+            usage = {}
+            for (owner, _), entry in self._entries.items():
+                if owner == session:
+                    usage[entry.kind] = usage.get(entry.kind, 0) + entry.nbytes
+            content_hash = self._session_dataset.get(session)
+            if content_hash is not None:
+                usage["dataset"] = self._datasets[content_hash][1]
+            return usage
+
+    def report(self):
+        with self._lock:
+            rows = []
+            for session in self._last_seen:
+                for kind, nbytes in self.session_usage(session).items():
+                    rows.append({"Session": session[:8], "Kind": kind, "MB": nbytes / 2**20})
+            return {
+                "sessions": len(self._last_seen),
+                "datasets": len(self._datasets),
+                "process_mb": self._process_bytes() / 2**20,
+                "process_budget_mb": self.process_budget / 2**20,
+                "session_budget_mb": self.session_budget / 2**20,
+                "evictions": dict(self._evictions),
+                "over_budget": sorted({self._entries[key].kind for key in self._oversized}),
+                "usage": pd.DataFrame(rows, columns=["Session", "Kind", "MB"]),
+            }
@@ -0,0 +1,99 @@
+"""Background rebuild of derived page data with stale-while-revalidate.
+
+A ``DerivedStore`` keeps the artifacts built for one dataset version.  When a
+page asks for a newer version, the store keeps serving the old artifacts and
+rebuilds on a shared thread pool, then swaps the new snapshot in with a
+single reference assignment.  Before the first build lands ``get()`` returns
+None and pages compute what they need inline, which is also what happens
+when ``INBLOOM_BACKGROUND_REFRESH=0``.
+"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from inbloom import charts, data, diagnostics, geo, leaderboard, memory, sketches, summary
+
+ENABLED = os.environ.get("INBLOOM_BACKGROUND_REFRESH", "1").lower() not in ("0", "false", "no", "off")
+
+FEATURED_EVENTS = ["Solo Dance", "Group Dance", "Singing", "Drama"]
+
+Snapshot = namedtuple("Snapshot", ["version", "artifacts", "nbytes"])
+
+# Shared by every store in the process; rebuilds are rare, so two threads suffice
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="inbloom-refresh")
+
+
+def build_artifacts(df):
+    with diagnostics.span("Refresh / Build"):
+        schedule_df = data.schedule_table(df)
+        schedule_days = {}
+        for day in sorted(schedule_df['Day'].unique()):
+            day_schedule = schedule_df[schedule_df['Day'] == day].sort_values('Time')
+            schedule_days[day] = (day_schedule, charts.schedule_timeline(day_schedule))
+
+        # Word clouds are left to the Text Analysis page, which builds them on
+        # first visit; prebuilding them here would import wordcloud on cold start
+        feedback = {event: data.feedback_text(df, event) for event in df["Event"].unique()}
+
+        return {
+            "featured_stats": data.featured_event_stats(df, FEATURED_EVENTS),
+            "state_counts": geo.state_counts(df),
+            "leaderboard": leaderboard.Leaderboard(df),
+            "sketches": sketches.build_partitions(df),
+            "summary": summary.summarize(df),
+            "event_schedule": data.event_schedule(df),
+            "sentiment": data.sentiment_counts(df),
+            "feedback": feedback,
+            "schedule_days": schedule_days,
+        }
+
+
+class DerivedStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._pending = None
+
+    def get(self, df, version):
+        if not ENABLED:
+            return None
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            diagnostics.record_cache("derived artifacts", True)
+        else:
+            diagnostics.record_cache("derived artifacts", False)
+            self._schedule(df, version)
+        return snapshot.artifacts if snapshot is not None else None
+
+    def version(self):
+        # Dataset version of the artifacts get() serves, which may lag the session's
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def nbytes(self):
+        snapshot = self._snapshot
+        return snapshot.nbytes if snapshot is not None else 0
+
+    def _schedule(self, df, version):
+        with self._lock:
+            if self._pending == version:
+                return
+            self._pending = version
+        _executor.submit(self._rebuild, df, version)
+
+    def _rebuild(self, df, version):
+        try:
+            artifacts = build_artifacts(df)
+        except Exception:
+            with self._lock:
+                if self._pending == version:
+                    self._pending = None
+            raise
+        # Sized here, off the request path; the dataset itself is accounted separately
+        nbytes = memory.estimate_size(artifacts, exclude=[df])
+        with self._lock:
+            # A newer version may have been requested while this one was building
+            if self._pending == version:
+                self._snapshot = Snapshot(version, artifacts, nbytes)
+                self._pending = None
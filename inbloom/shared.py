@@ -0,0 +1,111 @@
+"""Shared, memory-mapped participant table for multi-worker deployments.
+
+Set ``INBLOOM_SHARED_DATASET`` to a directory to enable it.  The first worker
+materializes the dataset there as one ``.npy`` file per column (string
+columns as categorical codes plus a small categories file); every worker then
+memory-maps the files read-only and wraps them in a DataFrame without
+copying, so the OS page cache holds a single copy for all processes.
+Near-unique string columns such as ``ParticipantID`` would make the
+categories as large as the table and private to every worker, so they are
+stored as Arrow string arrays and mapped in as ``string[pyarrow]`` instead.
+"""
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+import pandas as pd
+
+SHARED_PATH = os.environ.get("INBLOOM_SHARED_DATASET", "")
+SHARED_ROWS = int(os.environ.get("INBLOOM_SHARED_ROWS", "250"))
+
+MANIFEST = "manifest.json"
+# String columns with more distinct values than this share of rows go to Arrow
+HIGH_CARDINALITY_RATIO = 0.5
+
+
+def _codes_dtype(n_categories):
+    # Same widths pandas picks for categorical codes, so from_codes never recasts
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def materialize(df, path):
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".inbloom-", dir=parent)
+
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            np.save(os.path.join(staging, f"{column}.npy"), np.ascontiguousarray(series.to_numpy()))
+            columns.append({"name": column, "kind": "numeric"})
+        else:
+            codes, categories = pd.factorize(series, sort=True)
+            if len(categories) > HIGH_CARDINALITY_RATIO * len(df):
+                _save_arrow_strings(os.path.join(staging, f"{column}.arrow"), series)
+                columns.append({"name": column, "kind": "arrow_string"})
+                continue
+            np.save(os.path.join(staging, f"{column}.codes.npy"), codes.astype(_codes_dtype(len(categories))))
+            np.save(os.path.join(staging, f"{column}.categories.npy"), np.asarray(categories, dtype=str))
+            columns.append({"name": column, "kind": "categorical"})
+
+    with open(os.path.join(staging, MANIFEST), "w") as fh:
+        json.dump({"version": uuid.uuid4().hex, "rows": len(df), "columns": columns}, fh)
+
+    # Publish atomically; if another worker got there first, keep theirs
+    try:
+        os.rename(staging, path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            raise
+
+
+def _save_arrow_strings(path, series):
+    import pyarrow as pa
+
+    table = pa.table({"values": pa.array(series.astype(str).to_numpy(), type=pa.string())})
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _load_arrow_strings(path):
+    # Offsets and character data stay in the mapping; nothing is copied per worker
+    import pyarrow as pa
+
+    values = pa.ipc.open_file(pa.memory_map(path, "r")).read_all().column("values")
+    return pd.arrays.ArrowExtensionArray(values)
+
+
+def attach(path):
+    with open(os.path.join(path, MANIFEST)) as fh:
+        manifest = json.load(fh)
+
+    columns = {}
+    for column in manifest["columns"]:
+        name = column["name"]
+        if column["kind"] == "numeric":
+            columns[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        elif column["kind"] == "arrow_string":
+            columns[name] = _load_arrow_strings(os.path.join(path, f"{name}.arrow"))
+        else:
+            codes = np.load(os.path.join(path, f"{name}.codes.npy"), mmap_mode="r")
+            categories = np.load(os.path.join(path, f"{name}.categories.npy"))
+            columns[name] = pd.Categorical.from_codes(codes, categories=categories.astype(object), validate=False)
+
+    # copy=False keeps every column as its own block backed by the mapping
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs["shared_version"] = manifest["version"]
+    return df
+
+
+def attach_or_create(path, build_dataset, n_rows=SHARED_ROWS):
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        materialize(build_dataset(n_rows), path)
+    return attach(path)
@@ -0,0 +1,335 @@
+"""Mergeable sketches for approximate analytics over very large histories.
+
+* ``HyperLogLog``   distinct counts (Colleges, States, Events, Days)
+* ``KLLSketch``     Score and Age quantiles
+* ``CountMinSketch`` heavy-hitter feedback words and events
+
+One ``FestivalSketch`` is built per (Day, Event) partition and any selection
+is answered by merging the partitions it covers, so the Dashboard and word
+cloud work from a few kilobytes per partition instead of the full table.
+"""
+import math
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+PARTITION_COLUMNS = ("Day", "Event")
+DISTINCT_COLUMNS = ("College", "State", "Event", "Day")
+QUANTILE_COLUMNS = ("Score", "Age")
+# Low-cardinality columns are cheaper to count exactly than to sketch
+EXACT_COUNT_COLUMNS = ("Gender",)
+
+STOPWORDS = {"the", "and", "was", "with", "could", "not", "too", "had", "time", "for", "its", "really"}
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+
+def _hash(values):
+    # Categorical and object columns hash identically, so partitions always merge
+    return pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+
+
+class HyperLogLog:
+    def __init__(self, p=11):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        # Standard error of the estimate
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        hashes = _hash(values)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # frexp's exponent is the bit length; exact because remainder < 2**53
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rho = (64 - self.p) - bit_length + 1
+        np.maximum.at(self.registers, index, rho.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * math.log(self.m / zeros)   # Linear counting for small cardinalities
+        return float(raw)
+
+
+class KLLSketch:
+    def __init__(self, k=200, c=2 / 3, seed=None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self):
+        # Normalized rank error at 99% confidence (empirical fit from the KLL literature)
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * self.c ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays behind; every other item of the rest moves up at double weight
+                kept = items[:len(items) % 2]
+                promoted = items[len(kept):][self._rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        values, cumulative = self._weighted()
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        index = np.clip(np.searchsorted(cumulative, targets, side="left"), 0, len(values) - 1)
+        result = values[index]
+        # The exact extremes are tracked, so q=0 and q=1 need no approximation
+        result = np.where(np.asarray(qs) <= 0, self.min, result)
+        return np.where(np.asarray(qs) >= 1, self.max, result)
+
+    def cdf(self, points):
+        # Approximate fraction of values <= each point
+        if not self.n:
+            return np.zeros(len(points))
+        values, cumulative = self._weighted()
+        index = np.searchsorted(values, points, side="right")
+        return np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0) / cumulative[-1]
+
+
+class CountMinSketch:
+    # Odd 64-bit multipliers; each row maps a hash to a column by multiply-shift
+    MULTIPLIERS = np.array([
+        0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+        0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+    ], dtype=np.uint64)
+
+    def __init__(self, width=1024, depth=4, heavy_hitters=64):
+        if depth > len(self.MULTIPLIERS):
+            raise ValueError(f"depth must be at most {len(self.MULTIPLIERS)}")
+        self.width = width
+        self.depth = depth
+        self.capacity = heavy_hitters
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.candidates = {}
+
+    @property
+    def error_bound(self):
+        # Estimates overshoot by at most this much with probability 1 - e**-depth
+        return math.e / self.width * self.total
+
+    @property
+    def confidence(self):
+        return 1 - math.exp(-self.depth)
+
+    def _columns(self, keys):
+        mixed = _hash(keys)[None, :] * self.MULTIPLIERS[:self.depth, None]
+        return ((mixed >> np.uint64(32)) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, keys, counts=None):
+        if counts is None:
+            tallied = pd.Series(keys).value_counts()
+            tallied = tallied[tallied > 0]
+            keys, counts = list(tallied.index), tallied.to_numpy()
+        if not len(keys):
+            return
+        counts = np.asarray(counts, dtype=np.int64)
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+        self._refresh_candidates(list(keys))
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+        self._refresh_candidates(list(other.candidates))
+
+    def estimate(self, keys):
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def _refresh_candidates(self, new_keys):
+        # Space-Saving style: keep only the heaviest keys seen so far
+        keys = list(dict.fromkeys(list(self.candidates) + new_keys))
+        estimates = self.estimate(keys)
+        heaviest = np.argsort(-estimates, kind="stable")[:self.capacity]
+        self.candidates = {keys[i]: int(estimates[i]) for i in heaviest}
+
+    def top(self, n=None):
+        ranked = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n] if n else ranked
+
+
+def feedback_words(feedback):
+    # Tokenize each distinct phrase once and weight it by how often it occurs
+    phrase_counts = pd.Series(feedback).value_counts()
+    words = Counter()
+    for phrase, count in phrase_counts.items():
+        if not count:
+            continue
+        for word in WORD_PATTERN.findall(str(phrase).lower()):
+            if len(word) >= 3 and word not in STOPWORDS:
+                words[word] += int(count)
+    return words
+
+
+class FestivalSketch:
+    def __init__(self):
+        self.rows = 0
+        self.score_sum = 0.0
+        self.satisfaction_sum = 0.0
+        self.distinct = {column: HyperLogLog() for column in DISTINCT_COLUMNS}
+        self.quantiles = {column: KLLSketch() for column in QUANTILE_COLUMNS}
+        self.counts = {column: Counter() for column in EXACT_COUNT_COLUMNS}
+        self.words = CountMinSketch(width=512)
+        self.events = CountMinSketch(width=256, heavy_hitters=32)
+
+    @classmethod
+    def from_frame(cls, df):
+        sketch = cls()
+        sketch.rows = len(df)
+        sketch.score_sum = float(df["Score"].sum())
+        sketch.satisfaction_sum = float(df["Satisfaction"].sum())
+        for column in DISTINCT_COLUMNS:
+            sketch.distinct[column].update(df[column].to_numpy())
+        for column in QUANTILE_COLUMNS:
+            sketch.quantiles[column].update(df[column].to_numpy())
+        for column in EXACT_COUNT_COLUMNS:
+            counts = df[column].value_counts()
+            sketch.counts[column].update({key: int(value) for key, value in counts.items() if value})
+        words = feedback_words(df["Feedback"])
+        sketch.words.update(list(words), list(words.values()))
+        sketch.events.update(df["Event"].to_numpy())
+        return sketch
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.score_sum += other.score_sum
+        self.satisfaction_sum += other.satisfaction_sum
+        for column in DISTINCT_COLUMNS:
+            self.distinct[column].merge(other.distinct[column])
+        for column in QUANTILE_COLUMNS:
+            self.quantiles[column].merge(other.quantiles[column])
+        for column in EXACT_COUNT_COLUMNS:
+            self.counts[column].update(other.counts[column])
+        self.words.merge(other.words)
+        self.events.merge(other.events)
+        return self
+
+    def nbytes(self):
+        total = sum(hll.registers.nbytes for hll in self.distinct.values())
+        total += sum(level.nbytes for kll in self.quantiles.values() for level in kll.levels)
+        return total + self.words.table.nbytes + self.events.table.nbytes
+
+
+def build_partitions(df):
+    partitions = {}
+    for key, part in df.groupby(list(PARTITION_COLUMNS), observed=True, sort=False):
+        partitions[key] = FestivalSketch.from_frame(part)
+    return partitions
+
+
+def merge_partitions(partitions, days=None, events=None):
+    merged = FestivalSketch()
+    for (day, event), sketch in partitions.items():
+        if (days is None or day in days) and (events is None or event in events):
+            merged.merge(sketch)
+    return merged
+
+
+def dashboard_aggregates(partitions, events, days):
+    # Same keys as data.dashboard_aggregates, answered from the sketches
+    events, days = set(events), set(days)
+    selected = {key: sketch for key, sketch in partitions.items() if key[0] in days and key[1] in events}
+    merged = merge_partitions(selected)
+
+    rows_per_day, rows_per_event, score_per_event = Counter(), Counter(), Counter()
+    age_by_event = {}
+    for (day, event), sketch in selected.items():
+        rows_per_day[day] += sketch.rows
+        rows_per_event[event] += sketch.rows
+        score_per_event[event] += sketch.score_sum
+        age_by_event.setdefault(event, KLLSketch()).merge(sketch.quantiles["Age"])
+
+    rows = merged.rows
+    event_participation = pd.Series(dict(merged.events.top()), dtype="int64").sort_values(ascending=False)
+    avg_scores = pd.Series(
+        {event: score_per_event[event] / count for event, count in rows_per_event.items() if count},
+        dtype="float64"
+    ).sort_values(ascending=True)
+    return {
+        "participants": rows,
+        "colleges": round(merged.distinct["College"].estimate()),
+        "avg_score": merged.score_sum / rows if rows else float("nan"),
+        "satisfaction": merged.satisfaction_sum / rows if rows else float("nan"),
+        "events": round(merged.distinct["Event"].estimate()),
+        "days": round(merged.distinct["Day"].estimate()),
+        "event_participation": event_participation,
+        "day_trend": pd.DataFrame(sorted(rows_per_day.items()), columns=["Day", "count"]),
+        "avg_scores": avg_scores,
+        "gender_dist": pd.Series(merged.counts["Gender"], dtype="int64").sort_values(ascending=False),
+        "age_by_event": dict(sorted(age_by_event.items())),
+        "sketch": merged,
+    }
+
+
+def error_summary(sketch):
+    hll = next(iter(sketch.distinct.values()))
+    kll = next(iter(sketch.quantiles.values()))
+    return (
+        f"Approximate mode: distinct counts ±{hll.relative_error:.1%} (1σ), "
+        f"quantiles within ±{kll.rank_error:.1%} of rank (99%), "
+        f"word counts overestimate by at most {sketch.words.error_bound:,.0f} "
+        f"({sketch.words.confidence:.1%} confidence); "
+        f"sketch state {sketch.nbytes() / 1024:,.0f} KB."
+    )
@@ -0,0 +1,135 @@
+"""Single-pass, mergeable summary statistics for the Dataset Summary tab.
+
+``SummaryAccumulator`` takes the table in one piece or in chunks (e.g. from
+``pd.read_csv(..., chunksize=...)``) and keeps count/mean/M2, min/max, exact
+value histograms for the numeric columns and frequency tables for the
+categorical ones.  Quartiles come from the histograms with the same linear
+interpolation as ``DataFrame.describe()``, so the numbers match exactly.
+"""
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ("Age", "Score", "Satisfaction", "TotalUsers")
+CATEGORICAL_COLUMNS = ("Event", "Day", "Gender")
+
+
+class SummaryAccumulator:
+    def __init__(self, numeric_columns=NUMERIC_COLUMNS, categorical_columns=CATEGORICAL_COLUMNS):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        width = len(self.numeric_columns)
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.histograms = {column: pd.Series(dtype="int64") for column in self.numeric_columns}
+        self.frequencies = {column: pd.Series(dtype="int64") for column in self.categorical_columns}
+
+    def update(self, chunk):
+        if not len(chunk):
+            return self
+        # One sweep over all numeric columns at once
+        values = chunk[self.numeric_columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        filled = np.where(valid, values, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, filled.sum(axis=0) / count, 0.0)
+        m2 = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+        self._combine(count, mean, m2, np.nanmin(values, axis=0), np.nanmax(values, axis=0))
+
+        for column in self.numeric_columns:
+            self.histograms[column] = self.histograms[column].add(
+                _value_counts(chunk[column]), fill_value=0
+            ).astype("int64")
+        for column in self.categorical_columns:
+            self.frequencies[column] = self.frequencies[column].add(
+                _value_counts(chunk[column]), fill_value=0
+            ).astype("int64")
+        return self
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        for column in self.numeric_columns:
+            self.histograms[column] = self.histograms[column].add(other.histograms[column], fill_value=0).astype("int64")
+        for column in self.categorical_columns:
+            self.frequencies[column] = self.frequencies[column].add(other.frequencies[column], fill_value=0).astype("int64")
+        return self
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        # Chan et al. parallel update of count, mean and sum of squared deviations
+        total = self.count + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = self.m2 + m2 + np.where(total > 0, delta ** 2 * self.count * count / total, 0.0)
+        self.count = total
+        self.min = np.fmin(self.min, minimum)
+        self.max = np.fmax(self.max, maximum)
+
+    def describe(self):
+        # Same layout as DataFrame.describe() for the numeric columns
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+        quartiles = np.array([
+            _histogram_quantiles(self.histograms[column], [0.25, 0.5, 0.75]) for column in self.numeric_columns
+        ]).T
+        return pd.DataFrame(
+            [self.count, self.mean, std, self.min, *quartiles, self.max],
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            columns=self.numeric_columns,
+        )
+
+    def result(self):
+        return {
+            "describe": self.describe(),
+            "histograms": {column: hist.sort_index() for column, hist in self.histograms.items()},
+            "frequencies": {
+                column: freq.sort_values(ascending=False, kind="stable") for column, freq in self.frequencies.items()
+            },
+        }
+
+
+def _value_counts(series):
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    # Plain (non-categorical) index so chunks with different categories line up
+    if isinstance(counts.index, pd.CategoricalIndex):
+        counts.index = counts.index.astype(counts.index.categories.dtype)
+    return counts
+
+
+def _histogram_quantiles(histogram, qs):
+    # Linear interpolation between order statistics, as pandas' quantile does
+    histogram = histogram.sort_index()
+    n = int(histogram.sum())
+    if not n:
+        return [np.nan] * len(qs)
+    values = histogram.index.to_numpy(dtype=np.float64)
+    cumulative = np.cumsum(histogram.to_numpy())
+    result = []
+    for q in qs:
+        position = (n - 1) * q
+        low, high = int(np.floor(position)), int(np.ceil(position))
+        low_value = values[np.searchsorted(cumulative, low, side="right")]
+        high_value = values[np.searchsorted(cumulative, high, side="right")]
+        result.append(low_value + (position - low) * (high_value - low_value))
+    return result
+
+
+def summarize(df, chunk_rows=None):
+    accumulator = SummaryAccumulator()
+    if chunk_rows is None:
+        return accumulator.update(df).result()
+    for start in range(0, len(df), chunk_rows):
+        accumulator.update(df.iloc[start:start + chunk_rows])
+    return accumulator.result()
+
+
+def summarize_chunks(chunks):
+    # For out-of-core data, e.g. summarize_chunks(pd.read_csv(path, chunksize=500_000))
+    accumulator = SummaryAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
@@ -1,17 +1,17 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.express as px
-import plotly.graph_objects as go
-import random
-from wordcloud import WordCloud
-from PIL import Image, ImageFilter, ImageOps, ImageEnhance
 import base64
 from io import BytesIO
 import datetime
-import altair as alt
-import zipfile
+import time
+
+from inbloom import charts, data, diagnostics, export, geo, grid, leaderboard, live, memory, refresh, shared, sketches, summary
+from inbloom.diagnostics import span
+
+# Page-specific heavy dependencies (matplotlib, wordcloud, PIL, zipfile) are
+# imported inside the page that needs them so cold starts only pay for Home.
 
 # Set page config FIRST
 st.set_page_config(
@@ -178,79 +178,100 @@ try:
 except:
     logo_html = '<h2 style="text-align:center; color:#4CAF50; margin-top:10px;">InBloom</h2>'
 
-# ------------------ Dataset Generation Function ------------------
-def generate_dataset():
-    events = ["Solo Dance", "Group Dance", "Singing", "Drama", "Debate", 
-              "Photography", "Poetry", "Fashion Show", "Quiz", "Treasure Hunt"]
-    days = ["Day 1", "Day 2", "Day 3", "Day 4", "Day 5"]
-    colleges = ["College A", "College B", "College C", "College D", "College E"]
-    states = [
-        "Maharashtra", "Karnataka", "Tamil Nadu", "Kerala", 
-        "Gujarat", "Delhi", "Uttar Pradesh", "West Bengal",
-        "Rajasthan", "Madhya Pradesh", "Punjab", "Telangana"
-    ]
-    feedback_options = [
-        "Amazing event, really enjoyed it!",
-        "Could be better organized.",
-        "Loved the performance!",
-        "Not up to the mark.",
-        "Had a great time with friends.",
-        "The event was too long.",
-        "Well organized and fun.",
-        "Disappointing experience.",
-        "Incredible talent showcased.",
-        "Needs improvement in planning."
-    ]
-    
-    first_names = ["Alex", "Sam", "Jordan", "Taylor", "Casey", "Drew", "Jamie", "Robin", "Riley", "Cameron",
-                   "Aditya", "Priya", "Raj", "Neha", "Vikram", "Anjali", "Arjun", "Divya", "Karthik", "Meera"]
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Rodriguez", "Wilson",
-                  "Sharma", "Patel", "Kumar", "Singh", "Gupta", "Reddy", "Verma", "Shah", "Joshi", "Nair"]
-
-    data = []
-    for i in range(250):
-        participant_id = f"P{i+1:03d}"
-        name = random.choice(first_names) + " " + random.choice(last_names)
-        college = random.choice(colleges)
-        state = random.choice(states)
-        event = random.choice(events)
-        day = random.choice(days)
-        hour = random.randint(10, 18)
-        minute = random.randint(0, 59)
-        time_str = f"{hour:02d}:{minute:02d}"
-        feedback = random.choice(feedback_options)
-        age = random.randint(18, 25)  # Typical college age
-        score = random.randint(60, 100)  # Performance/participation score
-        gender = random.choice(["Male", "Female", "Non-binary"])
-        registration_type = random.choice(["Online", "On-site"])
-        satisfaction = random.randint(1, 5)  # 5-point scale
-        
-        data.append({
-            "ParticipantID": participant_id,
-            "Name": name,
-            "Age": age,
-            "Gender": gender,
-            "College": college,
-            "State": state,
-            "Event": event,
-            "Day": day,
-            "Time": time_str,
-            "Score": score,
-            "Registration": registration_type,
-            "Satisfaction": satisfaction,
-            "Feedback": feedback,
-            "TotalUsers": random.randint(2500, 3500)
-        })
-    df = pd.DataFrame(data)
-    return df
+# In shared mode every worker maps the same read-only files; one copy per process at most
+@st.cache_resource
+def load_shared_dataset(path):
+    return shared.attach_or_create(path, data.generate_dataset)
 
 # Initialize session state and dataset at the very beginning
+diagnostics.record_cache("session dataset", 'dataset' in st.session_state)
 if 'dataset' not in st.session_state:
-    st.session_state['dataset'] = generate_dataset()
+    with span("Data load"):
+        if shared.SHARED_PATH:
+            st.session_state['dataset'] = load_shared_dataset(shared.SHARED_PATH)
+            st.session_state['dataset_version'] = st.session_state['dataset'].attrs['shared_version']
+        else:
+            st.session_state['dataset'] = data.generate_dataset()
+            st.session_state['dataset_version'] = data.dataset_version(st.session_state['dataset'])
+
+# One memory manager per process: per-session budgets, LRU eviction of
+# recomputable artifacts, and one DataFrame for sessions with identical data
+@st.cache_resource
+def get_memory_manager():
+    return memory.SessionMemory()
+
+memory_manager = get_memory_manager()
+session_id = memory.current_session_id()
+memory_manager.touch(session_id)
+st.session_state['dataset'] = memory_manager.share_dataset(
+    session_id, st.session_state['dataset_version'], st.session_state['dataset']
+)
 
 # Get the dataset
 df = st.session_state['dataset']
 
+# Derived page data (aggregates, leaderboards, schedule figures) is rebuilt in the
+# background when the dataset changes; until then pages keep the previous version
+@st.cache_resource
+def shared_derived_store(path, version):
+    return refresh.DerivedStore()
+
+# The process-wide store only ever serves the shared dataset; a session that
+# regenerated its own data gets a private store like in per-session mode
+if shared.SHARED_PATH and st.session_state['dataset_version'] == load_shared_dataset(shared.SHARED_PATH).attrs['shared_version']:
+    derived_store = shared_derived_store(shared.SHARED_PATH, st.session_state['dataset_version'])
+else:
+    # Evictable: a session that loses its store rebuilds it in the background
+    derived_store = memory_manager.get_or_create(session_id, "derived_store", "derived artifacts", refresh.DerivedStore)
+
+artifacts = derived_store.get(df, st.session_state['dataset_version'])
+
+# Per-dataset-version artifacts live in this session's memory entries rather
+# than a process-wide cache, so they count against its budget, are evicted
+# least recently used like the derived store, and cannot keep an old dataset
+# alive unaccounted
+def session_cached(name, version, compute, *params):
+    return memory_manager.get_or_create(session_id, (name, version) + params, "view caches", compute)
+
+# Leaderboards are built once per dataset version and then served in O(K)
+def get_leaderboard(version, df):
+    return session_cached("leaderboard", version, lambda: leaderboard.Leaderboard(df))
+
+# Mergeable per Day/Event sketches behind the approximate analytics mode
+def get_sketch_partitions(version, df):
+    return session_cached("sketches", version, lambda: sketches.build_partitions(df))
+
+# Sorted row order per column for the Raw Data grid
+def get_sort_order(version, column, ascending, df):
+    return session_cached("sort order", version, lambda: grid.sort_order(df, column, ascending), column, ascending)
+
+# Single-pass describe() and frequency tables for the Summary Statistics tab
+def get_summary(version, df):
+    return session_cached("summary", version, lambda: summary.summarize(df))
+
+# Row mask and aggregates per filter selection, so a live tick only folds the
+# feed into aggregates that are already computed.  The filtered copy of the
+# table is not kept: with "All" filters it would be the whole table
+def get_dashboard_view(version, events, states, colleges, days, df):
+    def compute():
+        mask = grid.filter_mask(df, {"Event": events, "State": states, "College": colleges, "Day": days})
+        return mask, data.dashboard_aggregates(df[mask])
+    filters = tuple(tuple(selected) for selected in (events, states, colleges, days))
+    return session_cached("dashboard view", version, compute, filters)
+
+# Word clouds are built on the first Text Analysis visit of each event and options
+def get_wordcloud(version, event, background_color, min_word_length, text):
+    return session_cached(
+        "wordcloud", version, lambda: data.build_wordcloud(text, background_color, min_word_length),
+        event, background_color, min_word_length
+    )
+
+def derived(name, compute):
+    # Fall back to computing inline only before the first background build lands
+    if artifacts is not None:
+        return artifacts[name]
+    return compute()
+
 # Define filter options globally
 all_events = sorted(df["Event"].unique())
 all_states = sorted(df["State"].unique())
@@ -265,7 +286,16 @@ with st.sidebar:
     
     st.markdown('<div class="filter-section">', unsafe_allow_html=True)
     st.markdown('<p class="filter-label">📊 Navigation</p>', unsafe_allow_html=True)
-    page = st.radio("", ["Home", "Dataset", "Dashboard", "Text Analysis", "Image Processing", "Event Schedule"])
+    pages = ["Home", "Dataset", "Dashboard", "Text Analysis", "Image Processing", "Event Schedule"]
+    # The Diagnostics page stays hidden unless INBLOOM_DIAGNOSTICS is set
+    if diagnostics.ENABLED:
+        pages.append("Diagnostics")
+    page = st.radio("", pages)
+    approximate = st.toggle(
+        "≈ Approximate Analytics",
+        value=False,
+        help="Answer metrics, quantiles and word clouds from per Day/Event sketches instead of full scans"
+    )
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Only show filters if on Dashboard page
@@ -310,8 +340,19 @@ with st.sidebar:
         )
         if "All" in selected_day:
             selected_day = all_days
+        
+        # Live check-ins and scores, only offered when a feed is configured
+        live_enabled = bool(live.FEED_PATH) and st.toggle(
+            "📡 Live Feed",
+            value=True,
+            help=f"Fold in live check-ins and scores, refreshing every {live.REFRESH_SECONDS:g}s"
+        )
         st.markdown('</div>', unsafe_allow_html=True)
     
+    # This session's tracked memory against its budget
+    session_mb = sum(memory_manager.session_usage(session_id).values()) / 2**20
+    st.caption(f"🧠 Session memory: {session_mb:.1f} MB of {memory_manager.session_budget / 2**20:.0f} MB")
+    
     # Display current time
     now = datetime.datetime.now()
     st.markdown(f"<p style='text-align:center; color:{MUTED_TEXT}; font-size:0.9rem; margin-top:30px;'>📅 {now.strftime('%B %d, %Y')}<br>⏰ {now.strftime('%I:%M %p')}</p>", unsafe_allow_html=True)
@@ -320,20 +361,77 @@ with st.sidebar:
     st.markdown("<hr style='margin:30px 0 15px 0; opacity:0.3;'>", unsafe_allow_html=True)
     st.markdown("<p style='text-align:center; color:#888; font-size:0.8rem;'>© 2025 InBloom Festival<br>All rights reserved</p>", unsafe_allow_html=True)
 
+# One processed-image cache per server process, backed by local disk
+@st.cache_resource
+def get_image_cache():
+    from inbloom import imaging
+    return imaging.ProcessedImageCache()
+
+# One live feed per server process; every Dashboard viewer reads the same ring buffers
+@st.cache_resource
+def get_live_feed(path):
+    return live.LiveFeed(path)
+
+def show_export(name):
+    # Progress, error or download button for this session's export job;
+    # True while the job is still running, so the page keeps polling
+    export_job = memory_manager.get(session_id, name)
+    if export_job is None:
+        return False
+    if not export_job.done:
+        st.progress(
+            export_job.progress,
+            text=f"Exported {export_job.rows_written:,} of {export_job.total_rows:,} rows"
+        )
+        return True
+    if export_job.error is not None:
+        st.error(f"Export failed: {export_job.error}")
+        return False
+    st.download_button(
+        label=f"📥 Download {export_job.file_name}",
+        data=export_job.read(),
+        file_name=export_job.file_name,
+        mime=export.MIME_TYPES[export_job.fmt],
+    )
+    st.caption(
+        f"{export_job.total_rows:,} rows written in {export_job.finished - export_job.started:.1f}s"
+    )
+    # Count what the download button now holds in memory
+    memory_manager.resize(session_id, name)
+    return False
+
+# Time the whole page section; individual charts get their own spans
+page_started = diagnostics.start_span()
+live_refresh = False
+export_refresh = False
+
 # ------------------ Home Section ------------------
 if page == "Home":
     # Welcome message and stats overview
     st.markdown('<h2 class="section-header">Welcome to InBloom Festival 2025</h2>', unsafe_allow_html=True)
     
     # Quick stats
+    if approximate:
+        partitions = derived("sketches", lambda: get_sketch_partitions(st.session_state['dataset_version'], df))
+        festival_sketch = sketches.merge_partitions(partitions)
+        participant_count = festival_sketch.rows
+        college_count, event_count, day_count, state_count = (
+            f"≈{festival_sketch.distinct[column].estimate():,.0f}" for column in ("College", "Event", "Day", "State")
+        )
+    else:
+        participant_count = len(df)
+        college_count, event_count, day_count, state_count = (
+            df[column].nunique() for column in ("College", "Event", "Day", "State")
+        )
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown(f"""
         <div class="metric-box blue-metric">
             <h3 style="color: #1E88E5;">Total Participants</h3>
-            <h2 style="color: #000000;">{len(df)}</h2>
-            <p style="color: #666666;">From {df['College'].nunique()} colleges</p>
+            <h2 style="color: #000000;">{participant_count}</h2>
+            <p style="color: #666666;">From {college_count} colleges</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -341,8 +439,8 @@ if page == "Home":
         st.markdown(f"""
         <div class="metric-box green-metric">
             <h3 style="color: #4CAF50;">Events</h3>
-            <h2 style="color: #000000;">{df['Event'].nunique()}</h2>
-            <p style="color: #666666;">Across {df['Day'].nunique()} days</p>
+            <h2 style="color: #000000;">{event_count}</h2>
+            <p style="color: #666666;">Across {day_count} days</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -350,11 +448,14 @@ if page == "Home":
         st.markdown(f"""
         <div class="metric-box orange-metric">
             <h3 style="color: #FF9800;">States Represented</h3>
-            <h2 style="color: #000000;">{df['State'].nunique()}</h2>
+            <h2 style="color: #000000;">{state_count}</h2>
             <p style="color: #666666;">Pan-India participation</p>
         </div>
         """, unsafe_allow_html=True)
     
+    if approximate:
+        st.caption(sketches.error_summary(festival_sketch))
+    
     # About the festival
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown("""
@@ -385,10 +486,10 @@ if page == "Home":
         "Drama": "Theatrical presentations including one-act plays, mono-acting, and improvisations."
     }
 
+    featured_stats = derived("featured_stats", lambda: data.featured_event_stats(df, featured_events))
     for event in featured_events:
-        event_data = df[df["Event"] == event]
-        participants = len(event_data)
-        avg_score = round(event_data["Score"].mean(), 1)
+        participants = featured_stats[event]["participants"]
+        avg_score = featured_stats[event]["avg_score"]
         
         st.markdown(f"""
         <div style="background: white; border-radius: 10px; margin-bottom: 20px; box-shadow: 0 4px 10px rgba(0,0,0,0.1);">
@@ -401,7 +502,7 @@ if page == "Home":
                 <p style="color: #333333; margin-bottom: 10px;"><strong>Average Score:</strong> {avg_score}/100</p>
             </div>
             <div style="padding: 10px 15px; background-color: #f5f7fa; border-top: 1px solid #eaeaea; color: #666666; font-size: 0.9rem; border-radius: 0 0 10px 10px;">
-                Featured on {', '.join(event_data['Day'].unique())}
+                Featured on {', '.join(featured_stats[event]['days'])}
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -413,25 +514,31 @@ if page == "Home":
     # Create tabs for different content
     tab1, tab2, tab3 = st.tabs(["📈 Participation Trends", "🏆 Top Performers", "📅 Schedule"])
     
-    with tab1:
+    with tab1, span("Home / Participation Trends"):
         # Participant distribution by state
-        state_counts = df["State"].value_counts().reset_index()
-        state_counts.columns = ["State", "Count"]
-        
-        fig = px.choropleth(
-            state_counts,
-            locations="State",
-            locationmode="country names",
-            color="Count",
-            hover_name="State",
-            color_continuous_scale="Viridis",
-            title="Participant Distribution"
+        state_counts = derived("state_counts", lambda: geo.state_counts(df))
+        map_detail = st.select_slider(
+            "Map detail",
+            options=list(geo.TOLERANCES),
+            value="Balanced",
+            help="Coarser outlines send a smaller map to the browser"
         )
+        
+        fig = charts.state_choropleth(state_counts, geo.load_states(geo.TOLERANCES[map_detail]), geo.FEATURE_ID_KEY)
         st.plotly_chart(fig, use_container_width=True)
     
-    with tab2:
-        # Top scores by event
-        top_scores = df.sort_values("Score", ascending=False).head(10)
+    with tab2, span("Home / Top Performers"):
+        # Top scores overall or within one event, college or day
+        board = derived("leaderboard", lambda: get_leaderboard(st.session_state['dataset_version'], df))
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            scope = st.selectbox("Leaderboard", [leaderboard.OVERALL] + list(leaderboard.GROUP_COLUMNS))
+        with col2:
+            group = st.selectbox(scope, board.groups(scope), disabled=scope == leaderboard.OVERALL)
+        
+        top_scores = board.top(scope, group)
+        title = "Top 10 Performers Across All Events" if scope == leaderboard.OVERALL else f"Top 10 Performers: {group}"
         
         fig = px.bar(
             top_scores,
@@ -439,16 +546,17 @@ if page == "Home":
             y="Score",
             color="Event",
             text="Score",
+            hover_data=["Rank", "Percentile", "College", "Day"],
             labels={"Score": "Performance Score", "Name": "Participant"},
-            title="Top 10 Performers Across All Events"
+            title=title
         )
         fig.update_layout(xaxis_tickangle=-45)
         st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(top_scores, use_container_width=True, hide_index=True)
     
-    with tab3:
+    with tab3, span("Home / Schedule"):
         # Event schedule
-        event_schedule = df.groupby(["Day", "Event"]).size().reset_index(name="Participants")
-        event_schedule = event_schedule.sort_values(["Day", "Participants"], ascending=[True, False])
+        event_schedule = derived("event_schedule", lambda: data.event_schedule(df))
         
         # Custom styling for the table
         st.markdown("""
@@ -489,46 +597,88 @@ elif page == "Dataset":
     
     with tab1:
         st.write("Complete participant data from InBloom '25")
-        st.dataframe(df, use_container_width=True)
+        if st.button("🔄 Regenerate Dataset", help="Replace this session's dataset with a fresh synthetic one"):
+            st.session_state['dataset'] = data.generate_dataset()
+            st.session_state['dataset_version'] = data.dataset_version(st.session_state['dataset'])
+            # A prepared download of the old dataset no longer applies
+            memory_manager.remove(session_id, "dataset_export")
+            st.rerun()
         
-        # Download options
-        col1, col2 = st.columns(2)
-        with col1:
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "Download as CSV",
-                data=csv,
-                file_name="inbloom_dataset.csv",
-                mime="text/csv",
-                help="Download the complete dataset as CSV file",
-            )
+        # Sorting, filtering and paging run here; only the visible rows go to the browser
+        view_col1, view_col2, view_col3, view_col4 = st.columns(4)
+        with view_col1:
+            view_mode = st.radio("View", ["Pages", "Stratified sample"], horizontal=True)
+        with view_col2:
+            sort_column = st.selectbox("Sort by", ["(none)"] + list(df.columns))
+        with view_col3:
+            sort_ascending = st.toggle("Ascending", value=True)
+        with view_col4:
+            filter_column = st.selectbox("Filter column", ["(none)"] + list(df.columns))
         
-        with col2:
-            # Convert to Excel
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='InBloom_Data', index=False)
-            excel_data = buffer.getvalue()
-            
-            st.download_button(
-                "Download as Excel",
-                data=excel_data,
-                file_name="inbloom_dataset.xlsx",
-                mime="application/vnd.ms-excel",
-                help="Download the complete dataset as Excel file",
+        filters = {}
+        if filter_column != "(none)":
+            if pd.api.types.is_numeric_dtype(df[filter_column]):
+                low, high = int(df[filter_column].min()), int(df[filter_column].max())
+                filters[filter_column] = st.slider(f"{filter_column} range", low, high, (low, high))
+            elif filter_column in ("ParticipantID", "Name", "Feedback", "Time"):
+                filters[filter_column] = st.text_input(f"{filter_column} contains", "")
+            else:
+                filters[filter_column] = st.multiselect(
+                    f"{filter_column} is one of",
+                    sorted(df[filter_column].unique()),
+                    default=sorted(df[filter_column].unique())
+                )
+        
+        with span("Dataset / Raw Data Grid"):
+            mask = grid.filter_mask(df, filters) if filters else None
+            if view_mode == "Pages":
+                order = None
+                if sort_column != "(none)":
+                    order = get_sort_order(st.session_state['dataset_version'], sort_column, sort_ascending, df)
+                
+                page_col1, page_col2 = st.columns(2)
+                with page_col2:
+                    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=2)
+                total_rows = int(mask.sum()) if mask is not None else len(df)
+                n_pages = grid.page_count(total_rows, page_size)
+                with page_col1:
+                    page_number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+                
+                page_rows = grid.page(df, page_number, page_size, order, mask)
+                first_row = page_number * page_size + 1 if total_rows else 0
+                st.caption(f"Rows {first_row:,}–{page_number * page_size + len(page_rows):,} of {total_rows:,}")
+                st.dataframe(page_rows, use_container_width=True)
+            else:
+                sample_size = st.select_slider("Sample size", [100, 250, 500, 1000], value=500)
+                sample = grid.stratified_sample(df, sample_size, mask=mask)
+                if sort_column != "(none)":
+                    sample = sample.sort_values(sort_column, ascending=sort_ascending, kind="stable")
+                st.caption(f"Random sample of {len(sample):,} rows, stratified by Event and Day")
+                st.dataframe(sample, use_container_width=True)
+        
+        # Full-table downloads are written in the background on request, not
+        # serialized on every rerun of the page
+        download_format = st.selectbox("Download format", ["CSV", "Excel"])
+        if st.button("Prepare Download", help="Write the complete dataset to a file for download"):
+            download_job = export.start_export(df, None, download_format, stem="inbloom_dataset")
+            memory_manager.put(
+                session_id, "dataset_export", download_job, kind="export", recomputable=False,
+                on_evict=download_job.discard
             )
+        export_refresh = show_export("dataset_export")
     
     with tab2:
-        # Summary statistics
+        # Summary statistics, precomputed once per dataset version
+        stats = derived("summary", lambda: get_summary(st.session_state['dataset_version'], df))
         st.write("Key statistical measures for numerical columns")
-        st.dataframe(df.describe().round(2), use_container_width=True)
+        st.dataframe(stats["describe"].round(2), use_container_width=True)
         
         # Distribution of categorical variables
         col1, col2 = st.columns(2)
         
-        with col1:
+        with col1, span("Dataset / Event Distribution"):
             st.subheader("Event Distribution")
-            event_counts = df["Event"].value_counts().reset_index()
+            event_counts = stats["frequencies"]["Event"].reset_index()
             event_counts.columns = ["Event", "Count"]
             
             fig = px.pie(
@@ -542,9 +692,9 @@ elif page == "Dataset":
             fig.update_layout(uniformtext_minsize=12, uniformtext_mode='hide')
             st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
+        with col2, span("Dataset / Day-wise Distribution"):
             st.subheader("Day-wise Distribution")
-            day_counts = df["Day"].value_counts().reset_index()
+            day_counts = stats["frequencies"]["Day"].reset_index()
             day_counts.columns = ["Day", "Count"]
             
             fig = px.bar(
@@ -561,8 +711,8 @@ elif page == "Dataset":
         st.subheader("Participant Demographics")
         col1, col2 = st.columns(2)
         
-        with col1:
-            gender_counts = df["Gender"].value_counts().reset_index()
+        with col1, span("Dataset / Gender Distribution"):
+            gender_counts = stats["frequencies"]["Gender"].reset_index()
             gender_counts.columns = ["Gender", "Count"]
             
             fig = px.pie(
@@ -574,12 +724,15 @@ elif page == "Dataset":
             )
             st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
-            # Age distribution
-            fig = px.histogram(
-                df,
+        with col2, span("Dataset / Age Distribution"):
+            # Age distribution from the exact per-age histogram
+            age_counts = stats["histograms"]["Age"].reset_index()
+            age_counts.columns = ["Age", "Count"]
+            
+            fig = px.bar(
+                age_counts,
                 x="Age",
-                nbins=8,
+                y="Count",
                 title="Age Distribution",
                 color_discrete_sequence=["#4CAF50"]
             )
@@ -597,20 +750,24 @@ elif page == "Dataset":
         with col2:
             search_event = st.selectbox("Filter by event", ["All"] + list(df["Event"].unique()))
         
-        # Apply filters
-        filtered_results = df.copy()
+        # Matches are found as a row mask and only one page of them is sent to the browser
+        search_mask = np.ones(len(df), dtype=bool)
         if search_term:
-            filtered_results = filtered_results[
-                filtered_results["Name"].str.contains(search_term, case=False) | 
-                filtered_results["ParticipantID"].str.contains(search_term, case=False)
-            ]
-        
+            search_mask = (
+                grid.filter_mask(df, {"Name": search_term})
+                | grid.filter_mask(df, {"ParticipantID": search_term})
+            )
         if search_event != "All":
-            filtered_results = filtered_results[filtered_results["Event"] == search_event]
+            search_mask &= grid.filter_mask(df, {"Event": [search_event]})
         
         # Display filtered results
-        st.write(f"Found {len(filtered_results)} matching results:")
-        st.dataframe(filtered_results, use_container_width=True)
+        total_matches = int(search_mask.sum())
+        st.write(f"Found {total_matches} matching results:")
+        n_search_pages = grid.page_count(total_matches, 100)
+        search_page = st.number_input(
+            f"Page (of {n_search_pages})", min_value=1, max_value=n_search_pages, value=1, key="search_page"
+        ) - 1
+        st.dataframe(grid.page(df, search_page, 100, mask=search_mask), use_container_width=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -619,10 +776,44 @@ elif page == "Dashboard":
     st.markdown('<h2 class="section-header">Analytics Dashboard</h2>', unsafe_allow_html=True)
     
     # Apply filters to dataset
-    filtered_df = df[
-        (df["Event"].isin(selected_event)) &
-        (df["State"].isin(selected_state))
-    ]
+    with span("Dashboard / Filter"):
+        if approximate:
+            # Sketches are partitioned by Day/Event, so State and College filters do not apply
+            partitions = derived("sketches", lambda: get_sketch_partitions(st.session_state['dataset_version'], df))
+            aggregates = sketches.dashboard_aggregates(partitions, selected_event, selected_day)
+        else:
+            filtered_mask, aggregates = get_dashboard_view(
+                st.session_state['dataset_version'],
+                selected_event,
+                selected_state,
+                selected_college,
+                selected_day,
+                df
+            )
+            # Only the columns the row-level charts plot
+            filtered_df = df.loc[filtered_mask, ['Score', 'Age', 'Event']]
+    
+    live_totals = None
+    if live_enabled:
+        with span("Dashboard / Live Feed"):
+            feed = get_live_feed(live.FEED_PATH)
+            feed.poll()
+            live_snapshot = feed.snapshot()
+            live_totals = live.selected_totals(live_snapshot, selected_event, selected_day)
+            # Deltas are per session: the change since this viewer's previous refresh
+            previous_totals = st.session_state.get('live_totals', live_totals)
+            st.session_state['live_totals'] = live_totals
+            live_refresh = True
+        
+        participants = aggregates['participants'] + live_totals['checkins']
+        score_count = aggregates['participants'] + live_totals['scores']
+        avg_score = (
+            (aggregates['avg_score'] * aggregates['participants'] + live_totals['score_sum']) / score_count
+            if score_count else float('nan')
+        )
+    else:
+        participants = aggregates['participants']
+        avg_score = aggregates['avg_score']
     
     # Overview metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -631,13 +822,12 @@ elif page == "Dashboard":
         st.markdown(f"""
         <div class="metric-box primary-metric">
             <h3>Total Participants</h3>
-            <h2>{len(filtered_df)}</h2>
-            <p>From {filtered_df['College'].nunique()} colleges</p>
+            <h2>{participants}</h2>
+            <p>From {aggregates['colleges']} colleges</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        avg_score = filtered_df['Score'].mean()
         st.markdown(f"""
         <div class="metric-box secondary-metric">
             <h3>Average Score</h3>
@@ -647,7 +837,7 @@ elif page == "Dashboard":
         """, unsafe_allow_html=True)
     
     with col3:
-        satisfaction = filtered_df['Satisfaction'].mean()
+        satisfaction = aggregates['satisfaction']
         st.markdown(f"""
         <div class="metric-box accent-metric">
             <h3>Satisfaction Rate</h3>
@@ -657,24 +847,53 @@ elif page == "Dashboard":
         """, unsafe_allow_html=True)
     
     with col4:
-        total_events = filtered_df['Event'].nunique()
+        total_events = aggregates['events']
         st.markdown(f"""
         <div class="metric-box info-metric">
             <h3>Active Events</h3>
             <h2>{total_events}</h2>
-            <p>Across {filtered_df['Day'].nunique()} days</p>
+            <p>Across {aggregates['days']} days</p>
         </div>
         """, unsafe_allow_html=True)
 
+    if live_totals is not None:
+        live_col1, live_col2, live_col3 = st.columns(3)
+        live_col1.metric(
+            "Live Check-ins",
+            live_totals['checkins'],
+            delta=live_totals['checkins'] - previous_totals['checkins']
+        )
+        live_col2.metric(
+            "Live Scores",
+            live_totals['scores'],
+            delta=live_totals['scores'] - previous_totals['scores']
+        )
+        live_col3.metric(
+            "Live Avg Score",
+            f"{live_totals['score_sum'] / live_totals['scores']:.1f}" if live_totals['scores'] else "–"
+        )
+        
+        per_minute = live_snapshot['per_minute']
+        minute_trend = pd.DataFrame({
+            "Minute": pd.to_datetime(per_minute['start'], unit='s'),
+            "Check-ins": per_minute['checkins']
+        })
+        fig = px.bar(minute_trend, x="Minute", y="Check-ins", title="Live Check-ins per Minute (last hour)")
+        fig.update_layout(height=250, margin=dict(l=20, r=20, t=40, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+
+    if approximate:
+        st.caption(sketches.error_summary(aggregates['sketch']) + " State and College filters are ignored in this mode.")
+
     # Create tabs for different visualizations
     viz_tab1, viz_tab2, viz_tab3 = st.tabs(["📊 Participation", "📈 Performance", "🎯 Demographics"])
     
     with viz_tab1:
         col1, col2 = st.columns(2)
         
-        with col1:
+        with col1, span("Dashboard / Event-wise Participation"):
             # Event-wise participation
-            event_participation = filtered_df['Event'].value_counts()
+            event_participation = aggregates['event_participation']
             fig = px.bar(
                 x=event_participation.index,
                 y=event_participation.values,
@@ -686,9 +905,12 @@ elif page == "Dashboard":
             fig.update_layout(showlegend=False)
             st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
+        with col2, span("Dashboard / Daily Participation Trend"):
             # Day-wise trend
-            day_trend = filtered_df.groupby('Day').size().reset_index(name='count')
+            day_trend = aggregates['day_trend']
+            if live_totals is not None:
+                live_per_day = day_trend['Day'].astype(str).map(live_totals['per_day']).fillna(0).astype(int)
+                day_trend = day_trend.assign(count=day_trend['count'] + live_per_day.to_numpy())
             fig = px.line(
                 day_trend,
                 x='Day',
@@ -702,20 +924,29 @@ elif page == "Dashboard":
     with viz_tab2:
         col1, col2 = st.columns(2)
         
-        with col1:
+        with col1, span("Dashboard / Score Distribution"):
             # Score distribution
-            fig = px.histogram(
-                filtered_df,
-                x='Score',
-                nbins=20,
-                title="Score Distribution",
-                color_discrete_sequence=['#1E88E5']
-            )
+            if approximate:
+                score_sketch = aggregates['sketch'].quantiles['Score']
+                fig = charts.histogram_from_sketch(
+                    score_sketch,
+                    charts.sketch_bin_edges(score_sketch),
+                    "Score Distribution",
+                    '#1E88E5'
+                )
+            else:
+                fig = px.histogram(
+                    filtered_df,
+                    x='Score',
+                    nbins=20,
+                    title="Score Distribution",
+                    color_discrete_sequence=['#1E88E5']
+                )
             st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
+        with col2, span("Dashboard / Average Scores by Event"):
             # Event-wise average scores
-            avg_scores = filtered_df.groupby('Event')['Score'].mean().sort_values(ascending=True)
+            avg_scores = aggregates['avg_scores']
             fig = px.bar(
                 x=avg_scores.values,
                 y=avg_scores.index,
@@ -729,9 +960,9 @@ elif page == "Dashboard":
     with viz_tab3:
         col1, col2 = st.columns(2)
         
-        with col1:
+        with col1, span("Dashboard / Gender Distribution"):
             # Gender distribution
-            gender_dist = filtered_df['Gender'].value_counts()
+            gender_dist = aggregates['gender_dist']
             fig = px.pie(
                 values=gender_dist.values,
                 names=gender_dist.index,
@@ -741,18 +972,46 @@ elif page == "Dashboard":
             )
             st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
+        with col2, span("Dashboard / Age Distribution by Event"):
             # Age distribution
-            fig = px.box(
-                filtered_df,
-                y='Age',
-                x='Event',
-                title="Age Distribution by Event",
-                color='Event',
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_layout(showlegend=False)
+            if approximate:
+                fig = charts.box_from_sketches(aggregates['age_by_event'], "Age", "Age Distribution by Event")
+            else:
+                fig = px.box(
+                    filtered_df,
+                    y='Age',
+                    x='Event',
+                    title="Age Distribution by Event",
+                    color='Event',
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig.update_layout(showlegend=False)
             st.plotly_chart(fig, use_container_width=True)
+    
+    # Export the row-level slice behind the current filters, written in the background
+    with st.expander("📤 Export Filtered Data"):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", list(export.FORMATS))
+        with col2:
+            export_compression = st.selectbox("Compression", export.SUPPORTED_COMPRESSIONS[export_format])
+        
+        if st.button("Start Export"):
+            export_rows = np.flatnonzero(grid.filter_mask(df, {
+                "Event": selected_event,
+                "State": selected_state,
+                "College": selected_college,
+                "Day": selected_day,
+            }))
+            export_job = export.start_export(df, export_rows, export_format, export_compression)
+            # Only the user can redo an export, so it is never evicted; replacing it
+            # or the session ending discards its file
+            memory_manager.put(
+                session_id, "export_job", export_job, kind="export", recomputable=False,
+                on_evict=export_job.discard
+            )
+        
+        export_refresh = show_export("export_job")
 
 # ------------------ Text Analysis Section ------------------
 elif page == "Text Analysis":
@@ -762,12 +1021,14 @@ elif page == "Text Analysis":
     text_tab1, text_tab2 = st.tabs(["🔤 Word Cloud", "📊 Sentiment Analysis"])
     
     with text_tab1:
+        import matplotlib.pyplot as plt
+
         col1, col2 = st.columns([1, 2])
         
         with col1:
             selected_event_feedback = st.selectbox(
                 "Select Event",
-                options=df["Event"].unique(),
+                options=list(df["Event"].unique()),
                 key="wordcloud_event"
             )
             
@@ -783,17 +1044,37 @@ elif page == "Text Analysis":
                 value="#ffffff"
             )
         
-        with col2:
-            event_feedback = df[df["Event"] == selected_event_feedback]["Feedback"].str.cat(sep=" ")
-            if event_feedback.strip():
-                wc = WordCloud(
-                    width=800,
-                    height=400,
-                    background_color=background_color,
-                    min_word_length=min_word_length,
-                    colormap='viridis'
-                ).generate(event_feedback)
-                
+        with col2, span("Text Analysis / Word Cloud"):
+            wc = None
+            if approximate:
+                # Heavy-hitter words from the event's partitions instead of the raw feedback
+                partitions = derived("sketches", lambda: get_sketch_partitions(st.session_state['dataset_version'], df))
+                event_sketch = sketches.merge_partitions(partitions, events={selected_event_feedback})
+                frequencies = {
+                    word: count for word, count in event_sketch.words.top() if len(word) >= min_word_length
+                }
+                if frequencies:
+                    wc = data.build_wordcloud_from_frequencies(frequencies, background_color, min_word_length)
+                    st.caption(sketches.error_summary(event_sketch))
+            else:
+                # Prebuilt text only when it is this dataset's: a cloud built from a
+                # stale snapshot would be cached under the new version for good
+                feedback = {}
+                if derived_store.version() == st.session_state['dataset_version']:
+                    feedback = derived("feedback", lambda: {})
+                event_feedback = feedback.get(selected_event_feedback)
+                if event_feedback is None:
+                    event_feedback = data.feedback_text(df, selected_event_feedback)
+                if event_feedback.strip():
+                    wc = get_wordcloud(
+                        st.session_state['dataset_version'],
+                        selected_event_feedback,
+                        background_color,
+                        min_word_length,
+                        event_feedback
+                    )
+            
+            if wc is not None:
                 fig_wc, ax_wc = plt.subplots(figsize=(10, 5))
                 ax_wc.imshow(wc, interpolation="bilinear")
                 ax_wc.axis("off")
@@ -801,18 +1082,9 @@ elif page == "Text Analysis":
             else:
                 st.info("No feedback available for this event.")
     
-    with text_tab2:
+    with text_tab2, span("Text Analysis / Sentiment"):
         # Simple sentiment analysis based on predefined positive/negative words
-        positive_words = set(['excellent', 'amazing', 'great', 'good', 'wonderful', 'fantastic'])
-        negative_words = set(['poor', 'bad', 'disappointing', 'terrible', 'awful', 'horrible'])
-        
-        def analyze_sentiment(text):
-            words = set(text.lower().split())
-            pos_count = len(words.intersection(positive_words))
-            neg_count = len(words.intersection(negative_words))
-            return 'Positive' if pos_count > neg_count else 'Negative' if neg_count > pos_count else 'Neutral'
-        
-        sentiment_results = df['Feedback'].apply(analyze_sentiment).value_counts()
+        sentiment_results = derived("sentiment", lambda: data.sentiment_counts(df))
         
         fig = px.pie(
             values=sentiment_results.values,
@@ -824,23 +1096,29 @@ elif page == "Text Analysis":
 
 # ------------------ Image Processing Section ------------------
 elif page == "Image Processing":
+    import zipfile
+    from inbloom import imaging
+
     st.markdown('<h2 class="section-header">Event Image Processing</h2>', unsafe_allow_html=True)
     
     uploaded_files = st.file_uploader(
         "Upload Event Images",
-        type=['png', 'jpg', 'jpeg'],
+        type=['png', 'jpg', 'jpeg', 'gif'],
         accept_multiple_files=True
     )
     
+    # Streamlit keeps the uploads in memory; count them against this session
+    if uploaded_files:
+        memory_manager.record(session_id, "uploads", "uploads", sum(f.size for f in uploaded_files))
+    else:
+        memory_manager.remove(session_id, "uploads")
+    
     if uploaded_files:
         # Image processing options
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            filter_option = st.selectbox(
-                "Select Filter",
-                ["Original", "Grayscale", "Blur", "Edge Enhance", "Sharpen", "Emboss"]
-            )
+            filter_option = st.selectbox("Select Filter", imaging.FILTERS)
         
         with col2:
             brightness = st.slider("Brightness", 0.0, 2.0, 1.0, 0.1)
@@ -848,44 +1126,34 @@ elif page == "Image Processing":
         with col3:
             contrast = st.slider("Contrast", 0.0, 2.0, 1.0, 0.1)
         
+        with col4:
+            output_size = st.selectbox("Output Size", list(imaging.OUTPUT_SIZES))
+        
+        # Processed output is shared across sessions, keyed by upload content and settings
+        image_cache = get_image_cache()
+        processed_images = []
+        
         # Display images in grid
         cols = st.columns(3)
         for idx, uploaded_file in enumerate(uploaded_files):
-            with cols[idx % 3]:
-                img = Image.open(uploaded_file)
-                
-                # Apply selected filter
-                if filter_option == "Grayscale":
-                    img = ImageOps.grayscale(img)
-                elif filter_option == "Blur":
-                    img = img.filter(ImageFilter.BLUR)
-                elif filter_option == "Edge Enhance":
-                    img = img.filter(ImageFilter.EDGE_ENHANCE)
-                elif filter_option == "Sharpen":
-                    img = img.filter(ImageFilter.SHARPEN)
-                elif filter_option == "Emboss":
-                    img = img.filter(ImageFilter.EMBOSS)
-                
-                # Apply brightness and contrast
-                enhancer = ImageEnhance.Brightness(img)
-                img = enhancer.enhance(brightness)
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(contrast)
-                
-                st.image(img, caption=f"Processed Image {idx+1}", use_column_width=True)
+            with cols[idx % 3], span("Image Processing / Image"):
+                processed = image_cache.processed(
+                    uploaded_file.getvalue(),
+                    filter_option,
+                    brightness,
+                    contrast,
+                    imaging.OUTPUT_SIZES[output_size]
+                )
+                processed_images.append(processed)
+                st.image(processed, caption=f"Processed Image {idx+1}", use_column_width=True)
         
         # Add download button for processed images
         if st.button("Download Processed Images"):
             # Create a ZIP file containing all processed images
             zip_buffer = BytesIO()
             with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                for idx, uploaded_file in enumerate(uploaded_files):
-                    img = Image.open(uploaded_file)
-                    # Apply the same processing as above
-                    # Save to zip
-                    img_buffer = BytesIO()
-                    img.save(img_buffer, format="PNG")
-                    zip_file.writestr(f"processed_image_{idx+1}.png", img_buffer.getvalue())
+                for idx, processed in enumerate(processed_images):
+                    zip_file.writestr(f"processed_image_{idx+1}.{imaging.output_extension(processed)}", processed)
             
             st.download_button(
                 "Download ZIP",
@@ -901,8 +1169,7 @@ elif page == "Event Schedule":
     st.markdown('<h2 class="section-header">Event Schedule</h2>', unsafe_allow_html=True)
     
     # Create schedule dataframe
-    schedule_df = df.groupby(['Day', 'Event', 'Time']).size().reset_index(name='Participants')
-    schedule_df = schedule_df.sort_values(['Day', 'Time'])
+    schedule_days = derived("schedule_days", lambda: {})
     
     # Custom CSS for better timeline visualization
     st.markdown("""
@@ -951,72 +1218,22 @@ elif page == "Event Schedule":
     """, unsafe_allow_html=True)
     
     # Create tabs for different days
-    day_tabs = st.tabs([f"Day {day.split()[-1]}" for day in sorted(schedule_df['Day'].unique())])
+    if not schedule_days:
+        schedule_days = {}
+        schedule_df = data.schedule_table(df)
+        for day in sorted(schedule_df['Day'].unique()):
+            day_schedule = schedule_df[schedule_df['Day'] == day].sort_values('Time')
+            schedule_days[day] = (day_schedule, charts.schedule_timeline(day_schedule))
+    
+    day_tabs = st.tabs([f"Day {day.split()[-1]}" for day in schedule_days])
     
     # Color palette for different events
-    color_palette = {
-        "Solo Dance": "#FF6B6B",
-        "Group Dance": "#4ECDC4",
-        "Singing": "#45B7D1",
-        "Drama": "#96CEB4",
-        "Debate": "#FFEEAD",
-        "Photography": "#D4A5A5",
-        "Poetry": "#9B9B9B",
-        "Fashion Show": "#FFD93D",
-        "Quiz": "#6C5B7B",
-        "Treasure Hunt": "#FF8C42"
-    }
+    color_palette = charts.EVENT_COLORS
     
-    for idx, day in enumerate(sorted(schedule_df['Day'].unique())):
-        with day_tabs[idx]:
+    for idx, (day, (day_schedule, fig)) in enumerate(schedule_days.items()):
+        with day_tabs[idx], span("Event Schedule / Timeline"):
             st.markdown(f"<h3 style='color: #4CAF50;'>{day} Schedule</h3>", unsafe_allow_html=True)
             
-            day_schedule = schedule_df[schedule_df['Day'] == day].sort_values('Time')
-            
-            # Create timeline visualization
-            fig = go.Figure()
-            
-            for event in day_schedule['Event'].unique():
-                event_data = day_schedule[day_schedule['Event'] == event]
-                fig.add_trace(go.Scatter(
-                    x=event_data['Time'],
-                    y=[event] * len(event_data),
-                    mode='markers+text',
-                    name=event,
-                    text=event_data['Participants'].apply(lambda x: f'{x} participants'),
-                    marker=dict(
-                        size=20,
-                        color=color_palette[event],
-                        symbol='circle'
-                    ),
-                    textposition="top center"
-                ))
-            
-            fig.update_layout(
-                plot_bgcolor='#1a1a1a',
-                paper_bgcolor='#1a1a1a',
-                font=dict(color='white'),
-                showlegend=True,
-                height=400,
-                margin=dict(l=20, r=20, t=40, b=20),
-                xaxis=dict(
-                    showgrid=True,
-                    gridcolor='#2d2d2d',
-                    title='Time',
-                    title_font=dict(color='white')
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor='#2d2d2d',
-                    title='Event',
-                    title_font=dict(color='white')
-                ),
-                legend=dict(
-                    bgcolor='#2d2d2d',
-                    bordercolor='#3d3d3d'
-                )
-            )
-            
             st.plotly_chart(fig, use_container_width=True)
             
             # Display detailed schedule in a table
@@ -1045,3 +1262,86 @@ elif page == "Event Schedule":
             
             st.markdown("</table>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
+
+# ------------------ Diagnostics Section ------------------
+elif page == "Diagnostics":
+    st.markdown('<h2 class="section-header">Diagnostics</h2>', unsafe_allow_html=True)
+    st.write("Latency of page sections and charts across all sessions on this server process")
+
+    recorded = diagnostics.recorder.summary()
+
+    if recorded["spans"]:
+        spans_df = pd.DataFrame.from_dict(recorded["spans"], orient="index")
+        spans_df.index.name = "Span"
+        st.dataframe(spans_df.sort_values("p95_ms", ascending=False), use_container_width=True)
+
+        slowest = spans_df.sort_values("p95_ms", ascending=True).tail(15).reset_index()
+        fig = px.bar(
+            slowest,
+            x=["p50_ms", "p95_ms", "p99_ms"],
+            y="Span",
+            orientation="h",
+            barmode="group",
+            title="Slowest Spans (ms)"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No spans recorded yet. Visit some pages first.")
+
+    st.subheader("Cache Hit Rates")
+    if recorded["caches"]:
+        caches_df = pd.DataFrame.from_dict(recorded["caches"], orient="index")
+        caches_df.index.name = "Cache"
+        st.dataframe(caches_df, use_container_width=True)
+    else:
+        st.info("No cache lookups recorded yet.")
+
+    st.subheader("Session Memory")
+    memory_report = memory_manager.report()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Sessions", memory_report["sessions"])
+    col2.metric("Distinct Datasets", memory_report["datasets"])
+    col3.metric("Tracked Memory", f"{memory_report['process_mb']:.1f} MB", help=f"Budget {memory_report['process_budget_mb']:.0f} MB")
+    col4.metric("Evictions", sum(memory_report["evictions"].values()))
+    if not memory_report["usage"].empty:
+        per_session = memory_report["usage"].pivot_table(index="Session", columns="Kind", values="MB", aggfunc="sum", fill_value=0)
+        per_session["Total"] = per_session.sum(axis=1)
+        st.dataframe(per_session.sort_values("Total", ascending=False).round(2), use_container_width=True)
+    if memory_report["evictions"]:
+        st.caption("Evictions by kind: " + ", ".join(f"{kind} {count}" for kind, count in memory_report["evictions"].items()))
+    if memory_report["over_budget"]:
+        st.warning(
+            "Larger than the session budget on their own, so kept rather than rebuilt on every rerun: "
+            + ", ".join(memory_report["over_budget"])
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Export as JSON",
+            data=diagnostics.recorder.to_json(),
+            file_name="inbloom_diagnostics.json",
+            mime="application/json",
+        )
+    with col2:
+        if st.button("Reset Diagnostics"):
+            diagnostics.recorder.reset()
+            st.rerun()
+
+diagnostics.end_span(page, page_started)
+
+def wait_before_rerun(seconds):
+    # Reading session_state is a Streamlit yield point: a widget change made
+    # while we wait interrupts the wait and reruns with the new value at once
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        st.session_state.get('dataset_version')
+    st.rerun()
+
+# Keep the live Dashboard ticking; the rerun picks up whatever the feed appended
+if live_refresh:
+    wait_before_rerun(live.REFRESH_SECONDS)
+# Poll a running export's progress
+elif export_refresh:
+    wait_before_rerun(1)